@@ -1,55 +1,53 @@
-import boto3
+import base64
 import json
 from datetime import datetime
-import os
-import json
 from decimal import Decimal
 
-# 自定义 JSON 编码器，处理 Decimal 类型
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return int(o)  # 转换为整数
-        return super(DecimalEncoder, self).default(o)
+from apiCommon import grade_table as table, build_response
+from reportSnapshot import apply_grade_changes
+from gradeArchive import is_semester_archived, get_archived_grades, merge_archived
+
+# 教师成绩列表分页：每页返回的条数（有筛选条件时扫描到 1MB 分页边界为止，实际可能多于该值）
+GRADE_PAGE_SIZE = 100
+GRADE_MAX_PAGE_SIZE = 500
+# 单次请求最多调用 scan 的次数，按学号筛选时匹配很少，未凑满一页也先返回，由前端继续加载
+GRADE_SCAN_MAX_CALLS = 10
 
-# 初始化 DynamoDB 客户端
-dynamodb = boto3.resource('dynamodb')
-table_name = os.environ.get('TABLE_NAME', 'Grade')  # 从环境变量获取表名，默认StudentGrades
-table = dynamodb.Table(table_name)
+def encode_cursor(last_key):
+    return base64.urlsafe_b64encode(json.dumps(last_key).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """解析前端传回的分页游标（即 scan 的 LastEvaluatedKey），格式不对时抛出 ValueError"""
+    try:
+        last_key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeEncodeError):
+        raise ValueError('分页游标无效')
+    if not isinstance(last_key, dict) or not isinstance(last_key.get('gradeId'), str) or len(last_key) != 1:
+        raise ValueError('分页游标无效')
+    return last_key
 
 def lambda_handler(event, context):
-    # 解析请求方法和路径
-    http_method = event['httpMethod']
-    path = event['path']
-    
-    # 1. 查询成绩：GET /grades
-    if http_method == 'GET' and path == '/gradesTeacher':
-        return handle_query_grades(event)
-    
-    # 2. 修改成绩：PUT /grades/{id}
-    elif http_method == 'PUT' and path.startswith('/gradesTeacher/'):
-        grade_id = path.split('/')[-1]  # 提取路径中的成绩ID
-        return handle_update_grade(event, grade_id)
-    
-    # 3. 删除成绩：DELETE /grades/{id}
-    elif http_method == 'DELETE' and path.startswith('/gradesTeacher/'):
-        grade_id = path.split('/')[-1]
-        return handle_delete_grade(grade_id)
-    
-    # 无效请求
-    else:
-        return {
-            'statusCode': 404,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'message': '接口不存在'})
-        }
+    # 兼容旧的独立部署：统一交给 apiRouter 分发
+    import apiRouter
+    return apiRouter.lambda_handler(event, context)
 
-# 处理教师查询成绩（支持按学号筛选）
-def handle_query_grades(event):
+# 处理教师查询成绩（支持按学号、学期筛选，分页返回）：GET /gradesTeacher[?limit=100&cursor=上一页的nextCursor]
+def handle_query_grades(event, path_params):
     try:
         # 获取查询参数（教师可通过学号查询）
-        query_params = event.get('queryStringParameters', {})
+        query_params = event.get('queryStringParameters') or {}
         student_id = query_params.get('studentId')  # 教师输入的学号
+        semester = query_params.get('semester')  # 可选：指定学期
+        cursor = query_params.get('cursor')
+        try:
+            limit = int(query_params.get('limit', GRADE_PAGE_SIZE))
+        except ValueError:
+            return build_response(400, {'message': 'limit 必须是整数'})
+        try:
+            start_key = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return build_response(400, {'message': str(e)})
+        limit = max(1, min(limit, GRADE_MAX_PAGE_SIZE))
         
         # 构建筛选条件
         filter_expressions = []
@@ -58,51 +56,53 @@ def handle_query_grades(event):
         if student_id:
             filter_expressions.append('studentId = :s')
             expression_attrs[':s'] = student_id
+        if semester:
+            filter_expressions.append('semester = :sem')
+            expression_attrs[':sem'] = semester
         
-        # 执行扫描
-        scan_kwargs = {}
+        # 执行扫描：从游标处继续，凑满一页或达到调用次数上限即返回，其余由下一页继续
+        # 不筛选时每次只读一页的条数；有筛选条件时按 1MB 分页扫描，避免匹配很少时来回翻页
+        scan_kwargs = {'Limit': limit}
         if filter_expressions:
-            scan_kwargs['FilterExpression'] = ' AND '.join(filter_expressions)
-            scan_kwargs['ExpressionAttributeValues'] = expression_attrs
+            scan_kwargs = {
+                'FilterExpression': ' AND '.join(filter_expressions),
+                'ExpressionAttributeValues': expression_attrs
+            }
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = start_key
         
-        response = table.scan(** scan_kwargs)
-        grades = response.get('Items', [])
+        grades = []
+        for _ in range(GRADE_SCAN_MAX_CALLS):
+            response = table.scan(** scan_kwargs)
+            grades.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key or len(grades) >= limit:
+                break
+            scan_kwargs['ExclusiveStartKey'] = last_key
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({'grades': grades}, cls=DecimalEncoder) # 返回包含gradeId（id）的完整数据
-        }
+        # 指定的学期已归档时，在第一页合并该学期的归档成绩（未归档的学期不访问 S3）
+        if semester and not start_key and is_semester_archived(semester):
+            grades = merge_archived(grades, get_archived_grades(semester, student_id or None))
+        
+        # 返回包含gradeId（id）的完整数据（Decimal 由 jsonCodec 统一转换），nextCursor 为空表示已到最后一页
+        return build_response(200, {
+            'grades': grades,
+            'nextCursor': encode_cursor(last_key) if last_key else None
+        }, event)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({'message': f'查询失败：{str(e)}'})
-        }
+        return build_response(500, {'message': f'查询失败：{str(e)}'})
 
-# 处理教师修改成绩（通过gradeId定位记录）
-def handle_update_grade(event, grade_id):
+# 处理教师修改成绩（通过gradeId定位记录）：PUT /gradesTeacher/{gradeId}
+def handle_update_grade(event, path_params):
+    grade_id = path_params['gradeId']  # 路径中的成绩ID
     try:
-        body = json.loads(event['body'])
+        body = json.loads(event['body'], parse_float=Decimal)  # 小数分数直接解析为 Decimal，DynamoDB 不接受 float
         new_score = body.get('score')
         
         # 验证分数
         if new_score is None or not (0 <= new_score <= 100):
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-                },
-                'body': json.dumps({'message': '分数必须在0-100之间'})
-            }
+            return build_response(400, {'message': '分数必须在0-100之间'})
         
         # 执行更新
         update_response = table.update_item(
@@ -112,63 +112,37 @@ def handle_update_grade(event, grade_id):
                 ':score': new_score,
                 ':time': datetime.utcnow().isoformat()
             },
+            ConditionExpression='attribute_exists(gradeId)',  # 记录不存在（或已归档）时不新建空记录
             ReturnValues='ALL_NEW'
         )
+        apply_grade_changes(upserts=[update_response['Attributes']])
         
-        # 3. 返回结果时使用自定义编码器，处理Decimal
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({
-                'message': '成绩修改成功',
-                'updatedGrade': update_response['Attributes']
-            }, cls=DecimalEncoder)  
-        }
+        return build_response(200, {
+            'message': '成绩修改成功',
+            'updatedGrade': update_response['Attributes']
+        })
     
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return build_response(404, {'message': f'成绩记录不存在或已归档（gradeId：{grade_id}）'})
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({'message': f'修改失败：{str(e)}'}, cls=DecimalEncoder)
-        }
+        return build_response(500, {'message': f'修改失败：{str(e)}'})
 
-# 处理教师删除成绩（通过gradeId删除）
-def handle_delete_grade(grade_id):
+# 处理教师删除成绩（通过gradeId删除）：DELETE /gradesTeacher/{gradeId}
+def handle_delete_grade(event, path_params):
+    grade_id = path_params['gradeId']
     try:
         # 删除记录（主键为id，即gradeId）
-        table.delete_item(Key={'gradeId': grade_id})
+        delete_response = table.delete_item(
+            Key={'gradeId': grade_id},
+            ConditionExpression='attribute_exists(gradeId)',  # 记录不存在（或已归档）时返回 404，而不是假装删除成功
+            ReturnValues='ALL_OLD'
+        )
+        apply_grade_changes(removed=[delete_response['Attributes']])
         print(f"删除成功，gradeId：{grade_id}")  # 修复原代码中引用未定义event的错误
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({'message': f'成绩记录（gradeId：{grade_id}）删除成功'})
-        }
+        return build_response(200, {'message': f'成绩记录（gradeId：{grade_id}）删除成功'})
     
-    except table.meta.client.exceptions.ResourceNotFoundException:
-        return {
-            'statusCode': 404,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({'message': f'成绩记录不存在（gradeId：{grade_id}）'})
-        }
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return build_response(404, {'message': f'成绩记录不存在或已归档（gradeId：{grade_id}）'})
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'
-            },
-            'body': json.dumps({'message': f'删除失败：{str(e)}'})
-        }
\ No newline at end of file
+        return build_response(500, {'message': f'删除失败：{str(e)}'})
\ No newline at end of file
@@ -1,35 +1,34 @@
-import boto3
-import json 
+import json
 from datetime import datetime,timedelta
-import os
+from decimal import Decimal
 
-dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-grade_table = dynamodb.Table('Grade')  # 初始化表，变量名为grade_table
+from apiCommon import grade_table, build_response
+from reportSnapshot import apply_grade_changes
+from gradeSummary import parse_credit
 
-def handle_add_grade(event):
+# 处理添加成绩：POST /grades
+def handle_add_grade(event, path_params):
     try:
-        body = json.loads(event['body'])
-        
+        body = json.loads(event['body'], parse_float=Decimal)  # 小数分数解析为 Decimal，DynamoDB 不接受 float
+
         # 验证必填字段
         required_fields = ['id', 'studentId', 'course', 'score', 'semester']
         for field in required_fields:
             if field not in body:
-                return {
-                    'statusCode': 400,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'message': f'缺少必填字段：{field}'})
-                }
-        
+                return build_response(400, {'message': f'缺少必填字段：{field}'})
+
         # 验证分数范围
         if not (0 <= body['score'] <= 100):
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'message': '分数必须在0-100之间'})
-            }
-        
+            return build_response(400, {'message': '分数必须在0-100之间'})
+
+        # 学分可选，用于计算学分加权平均分与 GPA
+        try:
+            credit = parse_credit(body.get('credit'))
+        except ValueError as e:
+            return build_response(400, {'message': str(e)})
+
         # 写入DynamoDB时，使用初始化的grade_table变量
-        grade_table.put_item(Item={
+        item = {
             'gradeId': body['id'],  # 主键：gradeId
             'studentId': body['studentId'],
             'course': body['course'],
@@ -37,35 +36,21 @@ def handle_add_grade(event):
             'semester': body['semester'],
             'createTime': body.get('createTime', (datetime.utcnow() + timedelta(hours=8)).isoformat()),
             'updateTime': body.get('createTime', (datetime.utcnow() + timedelta(hours=8)).isoformat())
-        })
-        
-        return {
-            'statusCode': 201,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({
-                'message': '成绩添加成功',
-                'gradeId': body['id']  # 返回生成的gradeId
-            })
         }
-    
+        if credit is not None:
+            item['credit'] = credit
+        grade_table.put_item(Item=item)
+        apply_grade_changes(upserts=[item])
+
+        return build_response(201, {
+            'message': '成绩添加成功',
+            'gradeId': body['id']  # 返回生成的gradeId
+        })
+
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'message': f'添加失败：{str(e)}'})
-        }
+        return build_response(500, {'message': f'添加失败：{str(e)}'})
 
 def lambda_handler(event, context):
-    http_method = event['httpMethod']
-    path = event['path']
-    
-    # 处理添加成绩（POST /grades）
-    if http_method == 'POST' and path == '/grades':
-        return handle_add_grade(event)
-    # 其他路由（查询、修改、删除）可在此处补充
-    else:
-        return {
-            'statusCode': 404,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'message': '接口不存在'})
-        }
\ No newline at end of file
+    # 兼容旧的独立部署：统一交给 apiRouter 分发
+    import apiRouter
+    return apiRouter.lambda_handler(event, context)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import boto3
+import os
+
+from jsonCodec import dumps, accepts_gzip, gzip_body, GZIP_MIN_BYTES
+
+# 所有成绩相关接口共用的 DynamoDB 资源（每个容器只初始化一次）
+dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION', 'us-east-2'))
+grade_table = dynamodb.Table(os.environ.get('TABLE_NAME', 'Grade'))
+query_time_table = dynamodb.Table(os.environ.get('QUERY_TIME_TABLE', 'QueryTimeConfig'))
+snapshot_table = dynamodb.Table(os.environ.get('SNAPSHOT_TABLE', 'StudentReportSnapshot'))  # 学生成绩单快照，主键 studentId
+
+# 前端站点地址（跨域白名单）
+ALLOWED_ORIGIN = os.environ.get('ALLOWED_ORIGIN', 'http://grade111.s3-website.us-east-2.amazonaws.com')
+
+# 在 Lambda 内 gzip 压缩响应：需要 API Gateway 配置二进制媒体类型 */* 才能把 base64 还原成二进制，
+# 默认关闭（未配置时浏览器会收到 base64 文本）；也可以改用 API Gateway 自带的 minimumCompressionSize
+RESPONSE_GZIP = os.environ.get('RESPONSE_GZIP', '').lower() in ('1', 'true')
+
+# 调试日志默认关闭（DEBUG_LOG=1 开启）；任何一条日志最多保留 LOG_MAX_CHARS 个字符
+DEBUG_LOG = os.environ.get('DEBUG_LOG', '').lower() in ('1', 'true')
+LOG_MAX_CHARS = int(os.environ.get('LOG_MAX_CHARS', '500'))
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': ALLOWED_ORIGIN,
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-File-Name'
+}
+
+
+def build_response(status_code, body, event=None):
+    """统一构造 API Gateway 响应（附带 JSON 与跨域响应头）
+
+    开启 RESPONSE_GZIP、传入 event 且客户端支持 gzip 时，较大的响应体（如成绩列表）会被压缩返回。
+    """
+    headers = {'Content-Type': 'application/json'}
+    headers.update(CORS_HEADERS)
+    text = dumps(body)
+    if RESPONSE_GZIP and event is not None and len(text) >= GZIP_MIN_BYTES and accepts_gzip(event):
+        headers['Content-Encoding'] = 'gzip'
+        return {
+            'statusCode': status_code,
+            'headers': headers,
+            'body': gzip_body(text),
+            'isBase64Encoded': True
+        }
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': text
+    }
+
+
+def scan_all(table, **scan_kwargs):
+    """分页扫描整张表（单次 scan 最多返回 1MB，需按 LastEvaluatedKey 继续）"""
+    items = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def projection(fields):
+    """构造只读取指定属性的 ProjectionExpression（属性名统一用占位符，避免与保留字冲突）"""
+    names = {f'#p{position}': field for position, field in enumerate(fields)}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+
+def clip_log(text, limit=LOG_MAX_CHARS):
+    """截断过长的日志内容，避免把整批数据写进 CloudWatch"""
+    if len(text) <= limit:
+        return text
+    return f'{text[:limit]}…（已截断，共 {len(text)} 字符）'
+
+
+def debug_log(message):
+    """输出调试日志（需开启 DEBUG_LOG，长度受 LOG_MAX_CHARS 限制）"""
+    if DEBUG_LOG:
+        print(clip_log(str(message)))
@@ -0,0 +1,74 @@
+import re
+
+from apiCommon import build_response
+from reportSnapshot import rebuild_all_snapshots, REBUILD_EVENT_SOURCE
+from addGrade import handle_add_grade
+from batcgImportGrades import handle_batch_import
+from getStudentGrade import handle_get_student_grade
+from getTranscriptSummary import handle_get_transcript_summary, handle_teacher_transcript_summary
+from setQueryTime import handle_set_query_time, handle_get_query_time
+from GradeManagementFunction import handle_query_grades, handle_update_grade, handle_delete_grade
+
+# 路由表：(请求方法, 路径模板, 处理函数)，路径参数写成 {name}
+ROUTES = [
+    ('GET', '/grades', handle_get_student_grade),
+    ('GET', '/grades/summary', handle_get_transcript_summary),
+    ('POST', '/grades', handle_add_grade),
+    ('POST', '/grades/batch', handle_batch_import),
+    ('GET', '/gradesTeacher', handle_query_grades),
+    ('GET', '/gradesTeacher/summary', handle_teacher_transcript_summary),
+    ('PUT', '/gradesTeacher/{gradeId}', handle_update_grade),
+    ('DELETE', '/gradesTeacher/{gradeId}', handle_delete_grade),
+    ('GET', '/query-time', handle_get_query_time),
+    ('POST', '/query-time', handle_set_query_time),
+]
+
+
+def compile_routes(routes):
+    """冷启动时预编译路由表：静态路径走字典直查，带参数的模板编译为正则"""
+    static_routes = {}
+    dynamic_routes = {}
+    for method, template, handler in routes:
+        if '{' not in template:
+            static_routes[(method, template)] = handler
+            continue
+        pattern = re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', template)
+        dynamic_routes.setdefault(method, []).append((re.compile(f'^{pattern}$'), handler))
+    return static_routes, dynamic_routes
+
+
+STATIC_ROUTES, DYNAMIC_ROUTES = compile_routes(ROUTES)
+
+
+def resolve_route(http_method, path):
+    """根据请求方法和路径查找处理函数，返回 (handler, path_params)"""
+    handler = STATIC_ROUTES.get((http_method, path))
+    if handler:
+        return handler, {}
+    for pattern, handler in DYNAMIC_ROUTES.get(http_method, []):
+        match = pattern.match(path)
+        if match:
+            return handler, match.groupdict()
+    return None, {}
+
+
+def lambda_handler(event, context):
+    # EventBridge 定时任务或设置查询时间后的异步调用：重建成绩单快照
+    if event.get('source') in ('aws.events', REBUILD_EVENT_SOURCE):
+        return {'rebuiltStudents': rebuild_all_snapshots()}
+
+    http_method = event.get('httpMethod', '')
+    path = event.get('path', '').rstrip('/') or '/'
+
+    # 跨域预检请求直接放行
+    if http_method == 'OPTIONS':
+        return build_response(200, {})
+
+    # API Gateway 在没有查询参数时传 None，这里统一成空字典
+    event['queryStringParameters'] = event.get('queryStringParameters') or {}
+    event['headers'] = event.get('headers') or {}
+
+    handler, path_params = resolve_route(http_method, path)
+    if not handler:
+        return build_response(404, {'message': '接口不存在'})
+    return handler(event, path_params)
@@ -1,82 +1,123 @@
-import boto3
 import json
-import pandas as pd
 from io import BytesIO
 from datetime import datetime, timedelta
 import re
 import base64
+from urllib.parse import unquote
 from decimal import Decimal  # 导入Decimal
 
-# 初始化 DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-grade_table = dynamodb.Table('Grade')
+from apiCommon import grade_table, build_response
+from reportSnapshot import apply_grade_changes
+from gradeSummary import parse_credit
+
+# 文件必须包含的列
+REQUIRED_COLS = ['studentId', 'course', 'score', 'semester']
+# 可选列：学分（不填按 1 学分计算加权平均分与 GPA）
+OPTIONAL_COLS = ['credit']
+# 支持的文件扩展名（parquet / arrow 为教务系统直接导出的列式格式）
+SUPPORTED_EXTS = ('xlsx', 'xls', 'csv', 'parquet', 'arrow', 'feather', 'ipc')
 
 def lambda_handler(event, context):
+    # 兼容旧的独立部署：统一交给 apiRouter 分发
+    import apiRouter
+    return apiRouter.lambda_handler(event, context)
+
+def get_file_name(event):
+    """读取 X-File-Name 请求头（HTTP API 会把请求头转成小写；前端对中文文件名做了 URL 编码）"""
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == 'x-file-name' and value:
+            return unquote(value)
+    return 'unknown.xlsx'
+
+def read_columns(file_content, file_ext):
+    """按列读取上传文件，返回 (文件中的全部列名, {必填列及存在的可选列名: 值列表})
+
+    Parquet / Arrow IPC 通过 pyarrow 只读取必填列与可选列，不构造 DataFrame 或逐行对象；
+    Excel / CSV 仍由 pandas 解析后按列取出。依赖库均延迟加载，避免拖慢其他路由的冷启动。
+    """
+    if file_ext == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(BytesIO(file_content))
+        names = parquet_file.schema_arrow.names
+        table = parquet_file.read(columns=[col for col in REQUIRED_COLS + OPTIONAL_COLS if col in names])
+        return names, {name: table.column(name).to_pylist() for name in table.column_names}
+
+    if file_ext in ('arrow', 'feather', 'ipc'):
+        import pyarrow as pa
+
+        def open_ipc(options=None):
+            try:
+                return pa.ipc.open_file(BytesIO(file_content), options=options)  # IPC 文件格式（含 Feather v2）
+            except pa.ArrowInvalid:
+                return pa.ipc.open_stream(BytesIO(file_content), options=options)  # IPC 流格式
+
+        # 先只读 schema，再按列下标只解码需要的列（included_fields 为空表示全部列，因此没有需要的列时不读取）
+        names = open_ipc().schema.names
+        wanted = [names.index(col) for col in REQUIRED_COLS + OPTIONAL_COLS if col in names]
+        if not wanted:
+            return names, {}
+        table = open_ipc(pa.ipc.IpcReadOptions(included_fields=wanted)).read_all()
+        return names, {name: table.column(name).to_pylist() for name in table.column_names}
+
+    import pandas as pd
+    if file_ext in ('xlsx', 'xls'):
+        df = pd.read_excel(BytesIO(file_content), engine='openpyxl')
+    else:
+        df = pd.read_csv(BytesIO(file_content))
+    names = list(df.columns)
+    return names, {name: df[name].tolist() for name in REQUIRED_COLS + OPTIONAL_COLS if name in names}
+
+# 批量导入成绩：POST /grades/batch
+def handle_batch_import(event, path_params):
     try:
         # 解析请求中的文件
         if 'body' not in event or not event['body']:
-            return {
-                'statusCode': 400,
-                'headers': {'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'message': '未收到文件'})
-            }
+            return build_response(400, {'message': '未收到文件'})
         file_content = base64.b64decode(event['body'])
-        file_name = event.get('headers', {}).get('X-File-Name', 'unknown.xlsx')
+        file_name = get_file_name(event)
         file_ext = file_name.split('.')[-1].lower()
+        if file_ext not in SUPPORTED_EXTS:
+            return build_response(400, {'message': '不支持的文件格式'})
 
         # 读取并解析文件
-        df = None
         try:
-            if file_ext in ['xlsx', 'xls']:
-                df = pd.read_excel(BytesIO(file_content), engine='openpyxl')
-            elif file_ext == 'csv':
-                df = pd.read_csv(BytesIO(file_content))
-            else:
-                return {
-                    'statusCode': 400,
-                    'headers': {'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'message': '不支持的文件格式'})
-                }
+            found_cols, columns = read_columns(file_content, file_ext)
         except Exception as e:
-            return {
-                'statusCode': 400,
-                'headers': {'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'message': f'文件解析失败：{str(e)}'})
-            }
+            return build_response(400, {'message': f'文件解析失败：{str(e)}'})
 
         # 验证表头
-        required_cols = ['studentId', 'course', 'score', 'semester']
-        if not all(col in df.columns for col in required_cols):
-            return {
-                'statusCode': 400,
-                'headers': {'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({
-                    'message': '文件表头缺失，需包含：studentId, course, score, semester',
-                    'found_cols': list(df.columns)
-                })
-            }
+        if not all(col in columns for col in REQUIRED_COLS):
+            return build_response(400, {
+                'message': '文件表头缺失，需包含：studentId, course, score, semester',
+                'found_cols': list(found_cols)
+            })
 
-        # 处理每条数据
+        # 处理每条数据（按列压缩成行元组，不再逐行构造 pandas Series）；没有学分列时学分为空
+        row_cols = REQUIRED_COLS + [col for col in OPTIONAL_COLS if col in columns]
+        credits = columns.get('credit') or [None] * len(columns[REQUIRED_COLS[0]])
         success_count = 0
         failure_count = 0
         failures = []
+        imported = []
         beijing_time = datetime.utcnow() + timedelta(hours=8)
 
-        for _, row in df.iterrows():
+        for row in zip(*(columns[col] for col in REQUIRED_COLS), credits):
+            raw_student_id, raw_course, raw_score, raw_semester, raw_credit = row
             try:
-                student_id = str(row['studentId']).strip()
-                course = str(row['course']).strip()
+                student_id = str(raw_student_id).strip()
+                course = str(raw_course).strip()
                 # 分数转换为Decimal类型
-                score = Decimal(str(row['score']))
-                semester = str(row['semester']).strip()
+                score = Decimal(str(raw_score))
+                semester = str(raw_semester).strip()
 
                 if not (0 <= score <= 100):
                     raise ValueError('分数必须在0-100之间')
+                credit = parse_credit(raw_credit)
 
                 clean_course = re.sub(r'[^a-zA-Z0-9]', "", course)
                 grade_id = f"{student_id}_{clean_course}_{beijing_time.timestamp()}"
 
-                grade_table.put_item(Item={
+                item = {
                     'gradeId': grade_id,
                     'studentId': student_id,
                     'course': course,
@@ -84,28 +125,27 @@ def lambda_handler(event, context):
                     'semester': semester,
                     'createTime': beijing_time.isoformat(),
                     'updateTime': beijing_time.isoformat()
-                })
+                }
+                if credit is not None:
+                    item['credit'] = credit
+                grade_table.put_item(Item=item)
                 success_count += 1
+                imported.append(item)
             except Exception as e:
                 failure_count += 1
                 failures.append({
-                    'row': row.to_dict(),
+                    'row': dict(zip(row_cols, row)),
                     'error': str(e)
                 })
 
-        return {
-            'statusCode': 200,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({
-                'successCount': success_count,
-                'failureCount': failure_count,
-                'failures': failures
-            })
-        }
+        # 把本次导入的成绩合入相关学生的成绩单快照
+        apply_grade_changes(upserts=imported)
+
+        return build_response(200, {
+            'successCount': success_count,
+            'failureCount': failure_count,
+            'failures': failures
+        })
 
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'message': f'批量导入失败：{str(e)}'})
-        }
\ No newline at end of file
+        return build_response(500, {'message': f'批量导入失败：{str(e)}'})
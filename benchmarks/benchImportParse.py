@@ -0,0 +1,93 @@
+"""对比批量导入各文件格式的解析耗时与内存峰值（默认 10 万行）
+
+用法：python benchmarks/benchImportParse.py [行数]
+需要安装 pandas、openpyxl、pyarrow，内存统计依赖 Linux 的 /proc。
+"""
+import gc
+import multiprocessing
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from batcgImportGrades import read_columns
+
+
+def make_sheet(count):
+    """构造与导入模板一致的成绩表"""
+    return pd.DataFrame({
+        'studentId': [f'2023{i:06d}' for i in range(count)],
+        'course': [f'课程{i % 30}' for i in range(count)],
+        'score': [60 + (i % 80) / 2 for i in range(count)],
+        'semester': ['2024-2025学年第一学期'] * count,
+    })
+
+
+def encode(df, file_ext):
+    """把成绩表编码成上传文件的字节内容"""
+    buffer = BytesIO()
+    if file_ext == 'xlsx':
+        df.to_excel(buffer, index=False, engine='openpyxl')
+    elif file_ext == 'csv':
+        df.to_csv(buffer, index=False)
+    elif file_ext == 'parquet':
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.ipc.new_file(buffer, table.schema) as writer:
+            writer.write_table(table)
+    return buffer.getvalue()
+
+
+def read_status_kb(field):
+    """读取 /proc/self/status 中的内存字段（VmRSS 当前常驻内存，VmHWM 常驻内存峰值），单位字节"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def measure(file_content, file_ext, result_queue):
+    """在独立子进程中解析一次，回传 (解析耗时秒, 常驻内存峰值增量字节)"""
+    gc.collect()
+    rss_before = read_status_kb('VmRSS')
+    started = time.perf_counter()
+    _, columns = read_columns(file_content, file_ext)
+    elapsed = time.perf_counter() - started
+    assert len(columns['studentId']) > 0
+    peak_rss = read_status_kb('VmHWM')
+    result_queue.put((elapsed, max(peak_rss - rss_before, 0)))
+
+
+def run_isolated(file_content, file_ext):
+    """每种格式启动一个全新的子进程测量，避免继承父进程的内存峰值"""
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=measure, args=(file_content, file_ext, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    df = make_sheet(count)
+    print(f'行数：{count}')
+    print(f'{"格式":<10}{"文件大小":>14}{"解析耗时":>12}{"内存增量峰值":>14}')
+    for file_ext in ('xlsx', 'csv', 'parquet', 'arrow'):
+        file_content = encode(df, file_ext)
+        elapsed, peak_growth = run_isolated(file_content, file_ext)
+        print(f'{file_ext:<10}{len(file_content) / 1024:>12.0f}KB{elapsed * 1000:>10.0f}ms'
+              f'{peak_growth / 1048576:>12.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
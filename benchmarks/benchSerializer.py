@@ -0,0 +1,54 @@
+"""对比旧 DecimalEncoder 与 jsonCodec 的序列化耗时
+
+用法：python benchmarks/benchSerializer.py [行数]
+"""
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsonCodec
+
+
+# 原 GradeManagementFunction 中的编码器（逐个 Decimal 走 JSONEncoder.default）
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return int(o)
+        return super(DecimalEncoder, self).default(o)
+
+
+def make_grades(count):
+    """构造与 Grade 表结构一致的模拟数据（含半分成绩）"""
+    return [{
+        'gradeId': f'2023{i:06d}_Math_1730000000.0',
+        'studentId': f'2023{i:06d}',
+        'course': '高等数学',
+        'score': Decimal(60 + i % 40) + (Decimal('0.5') if i % 3 == 0 else 0),
+        'semester': '2024-2025学年第一学期',
+        'createTime': '2024-10-31T10:50:00',
+        'updateTime': '2024-10-31T10:50:00'
+    } for i in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    data = {'grades': make_grades(count)}
+    rounds = 20
+
+    old = timeit.timeit(lambda: json.dumps(data, cls=DecimalEncoder), number=rounds) / rounds
+    new = timeit.timeit(lambda: jsonCodec.dumps(data), number=rounds) / rounds
+    text = jsonCodec.dumps(data)
+    compressed = jsonCodec.gzip_body(text)
+
+    print(f'行数：{count}，JSON 后端：{"orjson" if jsonCodec.orjson else "json"}')
+    print(f'DecimalEncoder：{old * 1000:.2f} ms')
+    print(f'jsonCodec.dumps：{new * 1000:.2f} ms（{old / new:.1f}x）')
+    print(f'响应体：{len(text.encode("utf-8"))} 字节，gzip+base64 后 {len(compressed)} 字节')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""模拟成绩发布时刻的并发查询：数千名学生在查询时间段开放前后集中访问 GET /grades
+
+每名学生是一个 asyncio 协程：按到达时间发起查询，开放前收到 403 会隔几秒重试，
+开放后再按长尾分布重复刷新若干次。请求交给固定大小的线程池执行（相当于 Lambda 并发上限），
+DynamoDB 由 localDynamo 的内存替身提供，并按延迟模型模拟网络耗时。
+
+输出吞吐量、端到端 / 处理耗时的尾延迟曲线，以及每个请求的 DynamoDB 调用次数与读放大。
+
+用法：python benchmarks/loadReleaseWindow.py [--students 3000] [--concurrency 200] [--cold] ...
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import localDynamo
+
+localDynamo.install()
+
+import apiRouter
+from apiCommon import grade_table, query_time_table
+from queryWindows import GLOBAL_KEY, beijing_now
+from reportSnapshot import rebuild_all_snapshots
+
+SEMESTERS = ['2023-2024学年第二学期', '2024-2025学年第一学期']
+COURSES = ['高等数学', '大学英语', '线性代数', '大学物理', '程序设计基础', '数据结构', '概率论', '思想政治']
+PERCENTILES = (50, 75, 90, 95, 99, 99.9, 100)
+
+
+def make_student_ids(count, rng):
+    """按 入学年份 + 学院 + 班级 + 序号 生成学号，与真实学号一样集中在少数前缀下"""
+    student_ids = set()
+    while len(student_ids) < count:
+        year = rng.choice((2021, 2022, 2023, 2024))
+        college = rng.randint(1, 12)
+        class_no = rng.randint(1, 8)
+        seq = rng.randint(1, 40)
+        student_ids.add(f'{year}{college:02d}{class_no:02d}{seq:02d}')
+    return sorted(student_ids)
+
+
+def seed_tables(student_ids, courses_per_student, open_delay, rng):
+    """写入成绩数据和全局查询时间段（开放时间为当前北京时间 + open_delay 秒）"""
+    for student_id in student_ids:
+        for semester in SEMESTERS:
+            for course in rng.sample(COURSES, courses_per_student):
+                grade_id = f'{student_id}_{COURSES.index(course)}_{semester}'
+                grade_table.put_item(Item={
+                    'gradeId': grade_id,
+                    'studentId': student_id,
+                    'course': course,
+                    'score': Decimal(rng.randint(100, 200)) / 2,
+                    'semester': semester,
+                    'createTime': '2025-01-10T09:00:00',
+                    'updateTime': '2025-01-10T09:00:00'
+                })
+    opens_at = beijing_now() + timedelta(seconds=open_delay)
+    query_time_table.put_item(Item={
+        'configKey': GLOBAL_KEY,
+        'queryStartTime': opens_at.strftime('%Y-%m-%dT%H:%M:%S'),
+        'queryEndTime': (opens_at + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+
+
+def make_event(student_id, semester=None, response_format=None):
+    params = {'studentId': student_id}
+    if response_format:
+        params['format'] = response_format
+    if semester:
+        params['semester'] = semester
+    return {
+        'httpMethod': 'GET',
+        'path': '/grades',
+        'queryStringParameters': params,
+        'headers': {'Accept-Encoding': 'gzip, deflate, br'},
+    }
+
+
+def decode_body(response):
+    body = response.get('body') or '{}'
+    if response.get('isBase64Encoded'):
+        body = gzip.decompress(base64.b64decode(body))
+    return json.loads(body)
+
+
+def invoke(event, submitted_at):
+    """在线程池中执行一次请求，返回单个请求的统计"""
+    started_at = time.perf_counter()
+    localDynamo.stats.reset()
+    response = apiRouter.lambda_handler(event, None)
+    finished_at = time.perf_counter()
+    body = decode_body(response)
+    return {
+        'status': response['statusCode'],
+        'total': finished_at - submitted_at,  # 含等待空闲并发的排队时间
+        'service': finished_at - started_at,
+        'calls': localDynamo.stats.calls,
+        'items_read': localDynamo.stats.items_read,
+        'returned': body.get('gradeCount', 0) if response['statusCode'] == 200 else 0,
+        'bytes': len(response.get('body') or ''),
+    }
+
+
+async def simulate_student(student_id, arrival, refreshes, args, rng, loop, pool, results):
+    """一名学生的访问过程：开放前反复重试，开放后再刷新 refreshes 次"""
+    await asyncio.sleep(arrival)
+    remaining = refreshes
+    retries = 0
+    while True:
+        semester = rng.choice(SEMESTERS) if rng.random() < args.semester_ratio else None
+        result = await loop.run_in_executor(pool, invoke, make_event(student_id, semester, args.format), time.perf_counter())
+        results.append(result)
+        if result['status'] == 403 and retries < args.max_retries:
+            retries += 1
+        elif remaining > 0:
+            remaining -= 1
+        else:
+            return
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_time)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+
+def print_latency_curve(title, values):
+    values = sorted(values)
+    print(f'\n{title}（毫秒）')
+    scale = percentile(values, 100) or 1
+    for pct in PERCENTILES:
+        value = percentile(values, pct)
+        bar = '#' * max(1, int(40 * value / scale))
+        print(f'  p{pct:<5} {value * 1000:9.1f}  {bar}')
+
+
+def report(results, elapsed):
+    served = [result for result in results if result['status'] == 200]
+    statuses = Counter(result['status'] for result in results)
+    print(f'\n请求数：{len(results)}，耗时 {elapsed:.1f} s，吞吐量 {len(results) / elapsed:.0f} req/s')
+    print('状态码：' + '，'.join(f'{status}×{count}' for status, count in sorted(statuses.items())))
+    print(f'200 响应体平均 {sum(result["bytes"] for result in served) / max(1, len(served)):.0f} 字节')
+
+    print_latency_curve('端到端耗时（含排队）', [result['total'] for result in results])
+    print_latency_curve('处理耗时', [result['service'] for result in results])
+
+    calls = sorted(result['calls'] for result in results)
+    items_read = sorted(result['items_read'] for result in results)
+    returned = sum(result['returned'] for result in served)
+    print('\n每个请求的 DynamoDB 访问')
+    print(f'  调用次数：平均 {sum(calls) / len(calls):.2f}，p99 {percentile(calls, 99)}，最大 {calls[-1]}')
+    print(f'  读取条目：平均 {sum(items_read) / len(items_read):.2f}，p99 {percentile(items_read, 99)}，最大 {items_read[-1]}')
+    if returned:
+        served_read = sum(result['items_read'] for result in served)
+        print(f'  读放大（200 响应读取条目 / 返回成绩条数）：{served_read / returned:.3f}')
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    student_ids = make_student_ids(args.students, rng)
+
+    localDynamo.latency_scale = 0  # 造数据与预热不计入延迟
+    seed_tables(student_ids, args.courses, args.open_delay, rng)
+    if not args.cold:
+        rebuild_all_snapshots()  # 与设置查询时间时的预生成一致
+    localDynamo.latency_scale = args.latency_scale
+
+    # 到达时间：少部分学生提前守候，其余在开放后按指数分布集中涌入
+    # 刷新次数服从帕累托长尾：多数人看一两次，少数人反复刷新
+    plan = []
+    for student_id in student_ids:
+        if rng.random() < args.early_ratio:
+            arrival = rng.uniform(0, args.open_delay)
+        else:
+            arrival = args.open_delay + rng.expovariate(4 / args.burst)
+        refreshes = min(args.max_refreshes, int(rng.paretovariate(args.refresh_alpha)) - 1)
+        plan.append((student_id, arrival, refreshes))
+
+    print(f'学生：{len(student_ids)}，成绩：{len(grade_table.items)}，并发上限：{args.concurrency}，'
+          f'快照：{"未预生成" if args.cold else "已预生成"}，延迟倍率：{args.latency_scale}')
+    loop = asyncio.get_running_loop()
+    results = []
+    # 处理函数的调试日志在压测期间丢弃，避免刷屏
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool, \
+            open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started_at = time.perf_counter()
+        await asyncio.gather(*(
+            simulate_student(student_id, arrival, refreshes, args, random.Random(rng.random()), loop, pool, results)
+            for student_id, arrival, refreshes in plan
+        ))
+        elapsed = time.perf_counter() - started_at
+    report(results, elapsed)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='成绩发布时刻的并发查询压测')
+    parser.add_argument('--students', type=int, default=3000, help='学生人数')
+    parser.add_argument('--courses', type=int, default=6, help='每名学生每学期的课程数')
+    parser.add_argument('--concurrency', type=int, default=200, help='并发执行上限（Lambda 并发数）')
+    parser.add_argument('--open-delay', type=float, default=3.0, help='压测开始后多少秒开放查询')
+    parser.add_argument('--burst', type=float, default=10.0, help='开放后大部分学生到达的时间跨度（秒）')
+    parser.add_argument('--early-ratio', type=float, default=0.2, help='开放前就开始守候的学生比例')
+    parser.add_argument('--refresh-alpha', type=float, default=1.5, help='刷新次数帕累托分布参数，越小长尾越重')
+    parser.add_argument('--max-refreshes', type=int, default=20, help='单个学生开放后的最大刷新次数')
+    parser.add_argument('--max-retries', type=int, default=10, help='收到 403 后的最大重试次数')
+    parser.add_argument('--think-time', type=float, default=1.0, help='两次刷新之间的平均间隔（秒）')
+    parser.add_argument('--semester-ratio', type=float, default=0.1, help='带 semester 参数的请求比例')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='DynamoDB 延迟模型倍率，0 表示不模拟延迟')
+    parser.add_argument('--format', choices=('compact',), help='成绩响应格式，默认逐行对象')
+    parser.add_argument('--cold', action='store_true', help='不预生成快照，观察首次访问时按需构建的开销')
+    parser.add_argument('--seed', type=int, default=20250110)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,277 @@
+"""内存版 DynamoDB / S3 替身，供压测脚本在本地运行各个 Lambda 处理函数
+
+用法：在导入 apiRouter 等模块之前调用 install()，之后代码中的 boto3.resource('dynamodb')
+和 boto3.client('s3') 都会指向这里的内存实现。只实现了本项目用到的表达式写法。
+
+每次调用按简单的延迟模型 sleep（释放 GIL，多个线程可并发等待），并按线程统计
+调用次数与读取的条目数，用于计算每个请求的读放大。
+"""
+import bisect
+import copy
+import io
+import re
+import sys
+import threading
+import time
+import types
+
+from botocore.exceptions import ClientError
+
+# 各表的主键（与线上表结构一致）
+KEY_SCHEMA = {
+    'Grade': 'gradeId',
+    'QueryTimeConfig': 'configKey',
+    'StudentReportSnapshot': 'studentId',
+    'GradeArchiveIndex': 'studentId',
+    'StudentUser': 'userId',
+    'TeacherUser': 'userId',
+    'AdminUser': 'userId',
+}
+
+# 延迟模型（毫秒）：单次调用的基础耗时 + 每检查一个条目的额外耗时
+LATENCY_MS = {
+    'get_item': 2.0,
+    'put_item': 4.0,
+    'update_item': 4.0,
+    'delete_item': 4.0,
+    'scan': 8.0,
+    'query': 4.0,
+}
+PER_ITEM_MS = 0.01
+# 单页 scan 最多检查的条目数（模拟 1MB 分页）
+SCAN_PAGE_ITEMS = 1000
+
+
+class Stats(threading.local):
+    """按线程记录 DynamoDB 访问：调用次数、读取条目数（含被过滤掉的条目）、写入条目数"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.items_read = 0
+        self.items_written = 0
+
+
+stats = Stats()
+latency_scale = 1.0
+
+
+def _simulate(operation, items=0):
+    if latency_scale > 0:
+        time.sleep((LATENCY_MS[operation] + PER_ITEM_MS * items) * latency_scale / 1000)
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+class ResourceNotFoundException(Exception):
+    pass
+
+
+class _Exceptions:
+    ConditionalCheckFailedException = ConditionalCheckFailedException
+    ResourceNotFoundException = ResourceNotFoundException
+
+
+class _Client:
+    exceptions = _Exceptions
+
+
+class _Meta:
+    client = _Client()
+
+
+def _project(item, projection, names):
+    if not projection:
+        return copy.deepcopy(item)
+    fields = [names.get(field.strip(), field.strip()) for field in projection.split(',')]
+    return {field: copy.deepcopy(item[field]) for field in fields if field in item}
+
+
+def _matches(item, expression, values, names):
+    """支持形如 "a = :x AND b = :y" 的过滤条件"""
+    if not expression:
+        return True
+    for condition in re.split(r'\s+AND\s+', expression, flags=re.IGNORECASE):
+        attribute, placeholder = [part.strip() for part in condition.split('=')]
+        if item.get(names.get(attribute, attribute)) != values[placeholder]:
+            return False
+    return True
+
+
+def _check_condition(item, expression, values):
+    """写入条件：支持 attribute_exists(a)、attribute_not_exists(a) 与 "a = :x"，多个条件用 AND 连接"""
+    for condition in re.split(r'\s+AND\s+', expression, flags=re.IGNORECASE):
+        function = re.fullmatch(r'(attribute_exists|attribute_not_exists)\((\w+)\)', condition.strip())
+        if function:
+            exists = item is not None and function.group(2) in item
+            if exists != (function.group(1) == 'attribute_exists'):
+                return False
+        elif item is None or not _matches(item, condition, values, {}):
+            return False
+    return True
+
+
+def _check(item, expression, values):
+    if expression and not _check_condition(item, expression, values or {}):
+        raise ConditionalCheckFailedException(expression)
+
+
+class _BatchWriter:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def put_item(self, Item):
+        self.table.put_item(Item=Item)
+
+    def delete_item(self, Key):
+        self.table.delete_item(Key=Key)
+
+
+class LocalTable:
+    meta = _Meta()
+
+    def __init__(self, name):
+        self.name = name
+        self.key_name = KEY_SCHEMA.get(name, 'id')
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def _key_of(self, key):
+        return key[self.key_name]
+
+    def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None, **kwargs):
+        _simulate('get_item', 1)
+        with self.lock:
+            item = self.items.get(self._key_of(Key))
+            stats.calls += 1
+            stats.items_read += 1 if item else 0
+            if item is None:
+                return {}
+            return {'Item': _project(item, ProjectionExpression, ExpressionAttributeNames or {})}
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None, **kwargs):
+        _simulate('put_item', 1)
+        with self.lock:
+            _check(self.items.get(Item[self.key_name]), ConditionExpression, ExpressionAttributeValues)
+            self.items[Item[self.key_name]] = copy.deepcopy(Item)
+            stats.calls += 1
+            stats.items_written += 1
+        return {}
+
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeValues=None, ReturnValues=None, **kwargs):
+        _simulate('delete_item', 1)
+        with self.lock:
+            _check(self.items.get(self._key_of(Key)), ConditionExpression, ExpressionAttributeValues)
+            old = self.items.pop(self._key_of(Key), None)
+            stats.calls += 1
+            stats.items_written += 1
+        return {'Attributes': old} if old and ReturnValues == 'ALL_OLD' else {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues=None,
+                    ConditionExpression=None, ReturnValues=None, **kwargs):
+        _simulate('update_item', 1)
+        key = self._key_of(Key)
+        values = ExpressionAttributeValues or {}
+        with self.lock:
+            stats.calls += 1
+            stats.items_written += 1
+            _check(self.items.get(key), ConditionExpression, values)
+            item = self.items.setdefault(key, dict(Key))
+            # 依次处理 SET / ADD / REMOVE 子句
+            clauses = re.findall(r'(SET|ADD|REMOVE)\s+(.*?)(?=\s+(?:SET|ADD|REMOVE)\s|$)',
+                                 UpdateExpression.strip(), flags=re.IGNORECASE)
+            for action, assignments in clauses:
+                for assignment in assignments.split(','):
+                    action = action.upper()
+                    if action == 'REMOVE':
+                        item.pop(assignment.strip(), None)
+                    elif action == 'ADD':
+                        attribute, placeholder = assignment.split()
+                        value = values[placeholder]
+                        if isinstance(value, set):
+                            item[attribute] = set(item.get(attribute, set())) | value
+                        else:
+                            item[attribute] = item.get(attribute, 0) + value
+                    else:
+                        attribute, placeholder = [part.strip() for part in assignment.split('=')]
+                        item[attribute] = values[placeholder]
+            return {'Attributes': copy.deepcopy(item)} if ReturnValues == 'ALL_NEW' else {}
+
+    def scan(self, FilterExpression=None, ExpressionAttributeValues=None, ExpressionAttributeNames=None,
+             ProjectionExpression=None, ExclusiveStartKey=None, Limit=None, **kwargs):
+        with self.lock:
+            keys = sorted(self.items)
+            start = 0
+            if ExclusiveStartKey:
+                start = bisect.bisect_right(keys, self._key_of(ExclusiveStartKey))
+            page_keys = keys[start:start + min(SCAN_PAGE_ITEMS, Limit or SCAN_PAGE_ITEMS)]
+            names = ExpressionAttributeNames or {}
+            matched = [
+                _project(self.items[key], ProjectionExpression, names)
+                for key in page_keys
+                if _matches(self.items[key], FilterExpression, ExpressionAttributeValues or {}, names)
+            ]
+            stats.calls += 1
+            stats.items_read += len(page_keys)
+        _simulate('scan', len(page_keys))
+        response = {'Items': matched, 'Count': len(matched), 'ScannedCount': len(page_keys)}
+        if start + len(page_keys) < len(keys):
+            response['LastEvaluatedKey'] = {self.key_name: page_keys[-1]}
+        return response
+
+    def batch_writer(self, **kwargs):
+        return _BatchWriter(self)
+
+
+class LocalDynamoResource:
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    def Table(self, name):
+        with self.lock:
+            return self.tables.setdefault(name, LocalTable(name))
+
+
+class NoSuchKey(ClientError):
+    def __init__(self, key):
+        super().__init__({'Error': {'Code': 'NoSuchKey', 'Message': key}}, 'GetObject')
+
+
+class LocalS3:
+    class exceptions:
+        NoSuchKey = NoSuchKey
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NoSuchKey(Key)
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = Body
+
+
+dynamodb = LocalDynamoResource()
+s3 = LocalS3()
+
+
+def install():
+    """用内存实现替换 boto3 模块，需在导入任何 Lambda 模块之前调用"""
+    module = types.ModuleType('boto3')
+    module.resource = lambda service_name, **kwargs: dynamodb
+    module.client = lambda service_name, **kwargs: s3 if service_name == 's3' else _Client()
+    sys.modules['boto3'] = module
+    return dynamodb
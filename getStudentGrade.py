@@ -1,122 +1,102 @@
-import boto3
-import json
-from decimal import Decimal
-from datetime import datetime, timedelta  # 导入timedelta处理时区
+from apiCommon import build_response, debug_log, clip_log
+from reportSnapshot import get_student_report
+from queryWindows import get_window_index, beijing_now, GLOBAL_KEY
+from gradeArchive import get_archived_semesters, get_archived_grades, merge_archived
 
-# 初始化 DynamoDB 资源
-dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-grade_table = dynamodb.Table('Grade')
-query_time_table = dynamodb.Table('QueryTimeConfig')  # 新增查询时间表
+def lambda_handler(event, context):
+    # 兼容旧的独立部署：统一交给 apiRouter 分发
+    import apiRouter
+    return apiRouter.lambda_handler(event, context)
 
-def safe_parse_iso_time(time_str):
-    try:
-        # 尝试解析带时区的格式（如 2025-10-31T10:50:00+08:00）
-        return datetime.fromisoformat(time_str)
-    except ValueError:
-        # 若失败，尝试解析不带时区的格式（如 2025-10-31T10:50:00）
-        return datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%S")
+# 返回给前端的成绩列及缺省值
+GRADE_COLUMNS = {'course': '', 'score': 0, 'semester': '', 'updateTime': ''}
 
-def lambda_handler(event, context):
+def to_compact(visible, window_index):
+    """列式紧凑格式：查询时间段只列出一次，成绩按列输出为等长数组，window 列为时间段下标"""
+    window_keys = []
+    window_positions = {}
+    columns = {column: [] for column in GRADE_COLUMNS}
+    columns['window'] = []
+    for grade, window_key in visible:
+        for column, default in GRADE_COLUMNS.items():
+            columns[column].append(grade.get(column, default))  # Decimal 由 jsonCodec 统一转换
+        if window_key not in window_positions:
+            window_positions[window_key] = len(window_keys)
+            window_keys.append(window_key)
+        columns['window'].append(window_positions[window_key])
+    return {
+        'windows': [list(window_index.windows[window_key]) for window_key in window_keys],
+        'grades': columns
+    }
+
+# 学生查询本人成绩：GET /grades?studentId=xxx[&semester=学期][&format=compact]
+def handle_get_student_grade(event, path_params):
     try:
         # 1. 获取并校验 studentId
         query_params = event.get('queryStringParameters', {})
         student_id = query_params.get('studentId', '').strip()
-        print(f"前端传递的 studentId：{student_id}")
+        debug_log(f"前端传递的 studentId：{student_id}")
         if not student_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-                },
-                'body': json.dumps({'message': '缺少 studentId 参数（学号）'})
-            }
+            return build_response(400, {'message': '缺少 studentId 参数（学号）'})
 
-        # 2. 从 QueryTimeConfig 表中查询全局查询时间
-        time_config = query_time_table.get_item(
-            Key={'configKey': 'globalQueryTime'}
-        ).get('Item', {})
-        query_start_time = time_config.get('queryStartTime', '')
-        query_end_time = time_config.get('queryEndTime', '')
-        print(f"获取的查询时间范围：{query_start_time} 至 {query_end_time}")
-        
-        # 校验查询时间是否配置
-        if not query_start_time or not query_end_time:
-            return {
-                'statusCode': 403,
-                'headers': {
-                    'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-                },
-                'body': json.dumps({'message': '教师未配置查询时间，请联系教师设置'})
-            }
+        # 2. 读取预先生成的成绩单快照（一次 get_item，只取成绩列表）
+        report = get_student_report(student_id, fields=('grades',))
+        grades = report.get('grades', [])
 
-        # 3. 转换为北京时间后校验（UTC+8）
-        now = datetime.utcnow() + timedelta(hours=8)  # 转换为北京时间
-        start = safe_parse_iso_time(query_start_time)
-        end = safe_parse_iso_time(query_end_time)
-        if not (start <= now <= end):
-            return {
-                'statusCode': 403,
-                'headers': {
-                    'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-                },
-                'body': json.dumps({
-                    'message': '当前不在可查询时间区间内',
-                    'queryTimeRange': f"{query_start_time} 至 {query_end_time}",
-                    'currentBeijingTime': now.isoformat()  # 调试用：返回当前北京时间
-                })
-            }
+        # 指定学期时只返回该学期；若该学期已归档，再合并归档存储中的成绩
+        semester = query_params.get('semester', '').strip()
+        if semester:
+            grades = [grade for grade in grades if grade.get('semester') == semester]
+            if semester in get_archived_semesters(student_id):
+                grades = merge_archived(grades, get_archived_grades(semester, student_id))
 
-        # 4. 基于 studentId 筛选成绩
-        response = grade_table.scan(
-            FilterExpression='studentId = :sid',
-            ExpressionAttributeValues={':sid': student_id}
-        )
-        grades = response.get('Items', [])
-        print(f"查询到的原始成绩数据：{grades}")
+        # 3. 按北京时间（UTC+8）确定当前开放的查询时间段（内存区间索引，不再读表）
+        window_index = get_window_index()
+        now = beijing_now()
+        open_keys = window_index.open_keys(now)
+        global_start, global_end = window_index.windows.get(GLOBAL_KEY, ('', ''))
 
-        # 5. 格式化成绩并注入查询时间
-        formatted_grades = []
+        # 4. 每条成绩按适用的时间段（课程 > 学期 > 全局）判断是否可见
+        visible = []  # (成绩, 适用的时间段)
+        has_window = GLOBAL_KEY in window_index.windows
         for grade in grades:
-            score = int(grade['score']) if isinstance(grade['score'], Decimal) else grade.get('score', 0)
-            formatted_grades.append({
-                'course': grade.get('course', ''),
-                'score': score,
-                'semester': grade.get('semester', ''),
-                'updateTime': grade.get('updateTime', ''),
-                'queryStartTime': query_start_time,
-                'queryEndTime': query_end_time
-            })
+            window_key = window_index.applicable_key(grade.get('course', ''), grade.get('semester', ''))
+            if window_key is None:
+                continue
+            has_window = True
+            if window_key in open_keys:
+                visible.append((grade, window_key))
+        debug_log(f"当前开放的查询时间段：{sorted(open_keys)}，可见成绩 {len(visible)} 条")
+
+        # 校验查询时间是否配置
+        if not has_window:
+            return build_response(403, {'message': '教师未配置查询时间，请联系教师设置'})
 
-        # 6. 返回结果
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-            },
-            'body': json.dumps({
-                'studentId': student_id,
-                'gradeCount': len(formatted_grades),
-                'grades': formatted_grades,
-                'queryTimeRange': f"{query_start_time} 至 {query_end_time}"
+        # 没有任何成绩处于可查询时间段内
+        if not visible and (grades or GLOBAL_KEY not in open_keys):
+            return build_response(403, {
+                'message': '当前不在可查询时间区间内',
+                'queryTimeRange': f"{global_start} 至 {global_end}",
+                'currentBeijingTime': now.isoformat()  # 调试用：返回当前北京时间
             })
+
+        # 5. 返回结果：默认每条成绩一个对象并注入查询时间；format=compact 时按列返回
+        result = {
+            'studentId': student_id,
+            'gradeCount': len(visible),
+            'queryTimeRange': f"{global_start} 至 {global_end}"
         }
+        if query_params.get('format') == 'compact':
+            result['format'] = 'compact'
+            result.update(to_compact(visible, window_index))
+        else:
+            result['grades'] = []
+            for grade, window_key in visible:
+                row = {column: grade.get(column, default) for column, default in GRADE_COLUMNS.items()}
+                row['queryStartTime'], row['queryEndTime'] = window_index.windows[window_key]
+                result['grades'].append(row)
+        return build_response(200, result, event)
 
     except Exception as e:
-        print(f"查询失败，异常信息：{str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-            },
-            'body': json.dumps({'message': f'查询失败：{str(e)}'})
-        }
\ No newline at end of file
+        print(clip_log(f"查询失败，异常信息：{str(e)}"))
+        return build_response(500, {'message': f'查询失败：{str(e)}'})
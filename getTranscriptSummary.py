@@ -0,0 +1,77 @@
+from apiCommon import build_response, clip_log
+from reportSnapshot import get_student_report
+from queryWindows import get_window_index, beijing_now, GLOBAL_KEY
+from gradeArchive import get_archived_semesters, get_archived_grades, merge_archived
+from gradeSummary import summarize_by_semester, summary_view, combine
+
+def load_semester_summaries(student_id, semester=''):
+    """读取学生按学期的成绩汇总，返回 (grades, {学期: 累加值})
+
+    汇总随成绩单快照预先算好（成绩增删改时随快照一起更新），这里通常只需一次 get_item；
+    旧快照没有汇总时现算一次。指定的学期已归档时，合并归档成绩后单独计算该学期。
+    """
+    report = get_student_report(student_id, fields=('grades', 'semesterSummaries'))
+    grades = report.get('grades', [])
+    summaries = report.get('semesterSummaries')
+    if summaries is None:
+        summaries = summarize_by_semester(grades)
+
+    if semester:
+        grades = [grade for grade in grades if grade.get('semester') == semester]
+        summaries = {key: value for key, value in summaries.items() if key == semester}
+        if semester in get_archived_semesters(student_id):
+            grades = merge_archived(grades, get_archived_grades(semester, student_id))
+            summaries = summarize_by_semester(grades)
+    return grades, summaries
+
+def format_summary(student_id, summaries, semesters):
+    return {
+        'studentId': student_id,
+        'semesters': [dict(semester=semester, **summary_view(summaries[semester])) for semester in semesters],
+        'overall': summary_view(combine(summaries[semester] for semester in semesters))
+    }
+
+# 学生查询本人成绩汇总：GET /grades/summary?studentId=xxx[&semester=学期]
+def handle_get_transcript_summary(event, path_params):
+    try:
+        query_params = event.get('queryStringParameters', {})
+        student_id = query_params.get('studentId', '').strip()
+        if not student_id:
+            return build_response(400, {'message': '缺少 studentId 参数（学号）'})
+        grades, summaries = load_semester_summaries(student_id, query_params.get('semester', '').strip())
+
+        # 与成绩查询一致：一个学期的成绩全部处于开放时间段内，才返回该学期的汇总
+        window_index = get_window_index()
+        open_keys = window_index.open_keys(beijing_now())
+        has_window = GLOBAL_KEY in window_index.windows
+        pending = set()
+        for grade in grades:
+            window_key = window_index.applicable_key(grade.get('course', ''), grade.get('semester', ''))
+            if window_key is not None:
+                has_window = True
+            if window_key not in open_keys:
+                pending.add(grade.get('semester', ''))
+        if not has_window:
+            return build_response(403, {'message': '教师未配置查询时间，请联系教师设置'})
+
+        result = format_summary(student_id, summaries, sorted(set(summaries) - pending))
+        result['pendingSemesters'] = sorted(pending & set(summaries))
+        return build_response(200, result, event)
+
+    except Exception as e:
+        print(clip_log(f"成绩汇总查询失败，异常信息：{str(e)}"))
+        return build_response(500, {'message': f'查询失败：{str(e)}'})
+
+# 教师查询学生成绩汇总（不受查询时间段限制）：GET /gradesTeacher/summary?studentId=xxx[&semester=学期]
+def handle_teacher_transcript_summary(event, path_params):
+    try:
+        query_params = event.get('queryStringParameters', {})
+        student_id = query_params.get('studentId', '').strip()
+        if not student_id:
+            return build_response(400, {'message': '缺少 studentId 参数（学号）'})
+        _, summaries = load_semester_summaries(student_id, query_params.get('semester', '').strip())
+        return build_response(200, format_summary(student_id, summaries, sorted(summaries)), event)
+
+    except Exception as e:
+        print(clip_log(f"成绩汇总查询失败，异常信息：{str(e)}"))
+        return build_response(500, {'message': f'查询失败：{str(e)}'})
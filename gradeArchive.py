@@ -0,0 +1,177 @@
+import boto3
+import gzip
+import json
+import os
+import time
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+
+from apiCommon import dynamodb, grade_table, scan_all
+from jsonCodec import dumps
+from reportSnapshot import apply_grade_changes
+
+# 冷数据存储：S3 中按学期分区的 gzip 压缩 JSON，路径 grades/semester=<学期>/grades.json.gz
+ARCHIVE_BUCKET = os.environ.get('ARCHIVE_BUCKET', 'grade-archive')
+ARCHIVE_PREFIX = 'grades'
+# 学生归档索引表：主键 studentId，semesters 为该学生已归档学期的字符串集合
+archive_index_table = dynamodb.Table(os.environ.get('ARCHIVE_INDEX_TABLE', 'GradeArchiveIndex'))
+# 索引表中记录“已归档学期集合”的特殊条目，读取归档文件前先据此判断，未归档的学期不访问 S3
+ARCHIVED_SEMESTERS_KEY = '#archivedSemesters'
+# 其他容器归档新学期后，本容器最多在该秒数后可见
+ARCHIVED_SEMESTERS_TTL = int(os.environ.get('ARCHIVED_SEMESTERS_TTL', '300'))
+# 归档文件在容器内的缓存时间（秒）：归档任务重跑会改写归档文件，其他容器最多在该秒数后读到新内容
+ARCHIVE_CACHE_TTL = int(os.environ.get('ARCHIVE_CACHE_TTL', '300'))
+# 读取归档文件时视为“没有归档”的 S3 错误（桶或对象不存在）；权限错误等照常抛出
+MISSING_ARCHIVE_ERRORS = ('NoSuchKey', 'NoSuchBucket', '404')
+
+# 剩余执行时间低于该值（毫秒）时停止处理下一个学期，由下一次调用继续
+TIME_BUDGET_MARGIN_MS = 60 * 1000
+
+# 每个容器缓存已读取的学期：学期 -> (读取时间, {studentId: [成绩...]})，超过 ARCHIVE_CACHE_TTL 重新读取
+_semester_cache = {}
+_archived_semesters = None
+_archived_semesters_loaded_at = 0.0
+_s3 = None
+
+
+def get_s3():
+    """延迟创建 S3 客户端，只有涉及历史学期的请求才需要"""
+    global _s3
+    if _s3 is None:
+        _s3 = boto3.client('s3')
+    return _s3
+
+
+def archive_key(semester):
+    return f'{ARCHIVE_PREFIX}/semester={semester}/grades.json.gz'
+
+
+def read_semester_archive(semester):
+    """直接从 S3 读取某学期的归档，返回 {studentId: [成绩...]}；读取失败时抛出异常"""
+    response = get_s3().get_object(Bucket=ARCHIVE_BUCKET, Key=archive_key(semester))
+    return json.loads(gzip.decompress(response['Body'].read()), parse_float=Decimal)['grades']
+
+
+def load_semester_archive(semester):
+    """查询用：读取某学期的归档并缓存 ARCHIVE_CACHE_TTL 秒；归档不存在时按空处理（不缓存）"""
+    cached = _semester_cache.get(semester)
+    if cached and time.monotonic() - cached[0] <= ARCHIVE_CACHE_TTL:
+        return cached[1]
+    try:
+        grades_by_student = read_semester_archive(semester)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in MISSING_ARCHIVE_ERRORS:
+            raise
+        print(f"学期 {semester} 的归档文件不存在，按无归档处理：{str(e)}")
+        return {}
+    _semester_cache[semester] = (time.monotonic(), grades_by_student)
+    return grades_by_student
+
+
+def write_semester_archive(semester, grades_by_student):
+    """整体写入某学期的归档文件（同一内容重复写入结果不变）"""
+    body = gzip.compress(dumps({'semester': semester, 'grades': grades_by_student}).encode('utf-8'))
+    get_s3().put_object(
+        Bucket=ARCHIVE_BUCKET,
+        Key=archive_key(semester),
+        Body=body,
+        ContentType='application/json',
+        ContentEncoding='gzip'
+    )
+    _semester_cache.pop(semester, None)
+
+
+def get_all_archived_semesters():
+    """所有已归档的学期（容器内缓存，超过 TTL 重新读取，一次 get_item）"""
+    global _archived_semesters, _archived_semesters_loaded_at
+    if _archived_semesters is None or time.monotonic() - _archived_semesters_loaded_at > ARCHIVED_SEMESTERS_TTL:
+        _archived_semesters = get_archived_semesters(ARCHIVED_SEMESTERS_KEY)
+        _archived_semesters_loaded_at = time.monotonic()
+    return _archived_semesters
+
+
+def is_semester_archived(semester):
+    return semester in get_all_archived_semesters()
+
+
+def get_archived_semesters(student_id):
+    """查询学生已归档的学期集合（一次 get_item）"""
+    item = archive_index_table.get_item(Key={'studentId': student_id}).get('Item', {})
+    return set(item.get('semesters', set()))
+
+
+def get_archived_grades(semester, student_id=None):
+    """读取历史学期的归档成绩，可按学号筛选"""
+    grades_by_student = load_semester_archive(semester)
+    if student_id is not None:
+        return list(grades_by_student.get(student_id, []))
+    return [grade for grades in grades_by_student.values() for grade in grades]
+
+
+def merge_archived(hot_grades, archived_grades):
+    """合并热数据与归档数据；归档任务进行中同一条成绩可能同时存在于两处，按 gradeId 去重"""
+    seen = {grade.get('gradeId') for grade in hot_grades}
+    return hot_grades + [grade for grade in archived_grades if grade.get('gradeId') not in seen]
+
+
+def archive_semester(semester):
+    """把一个已结束学期的成绩从 Grade 表迁移到归档存储
+
+    步骤依次为：合并写入归档文件 -> 更新学生索引 -> 从 Grade 表删除 -> 更新快照。
+    每一步都可以重复执行，任一步中断后重新运行即可继续完成。
+    """
+    hot_grades = scan_all(
+        grade_table,
+        FilterExpression='semester = :sem',
+        ExpressionAttributeValues={':sem': semester},
+        ConsistentRead=True
+    )
+    # 已归档学期集合直接读表（不用容器缓存）；归档过的学期必须读到已有归档才能合并，读取失败时中止
+    already_archived = semester in get_archived_semesters(ARCHIVED_SEMESTERS_KEY)
+    archived_by_student = read_semester_archive(semester) if already_archived else {}
+
+    if not hot_grades:
+        # 上次运行可能在删除热数据之后、更新快照之前中断：按归档内容再更新一次快照（重复执行结果不变）
+        apply_grade_changes(removed=[grade for grades in archived_by_student.values() for grade in grades])
+        return 0
+
+    # 1. 与已有归档按 gradeId 合并，避免中断重跑时丢失上次已删除的记录
+    grades_by_id = {grade['gradeId']: grade for grades in archived_by_student.values() for grade in grades}
+    grades_by_id.update({grade['gradeId']: grade for grade in hot_grades})
+    grades_by_student = {}
+    for grade in grades_by_id.values():
+        grades_by_student.setdefault(grade['studentId'], []).append(grade)
+    write_semester_archive(semester, grades_by_student)
+
+    # 2. 更新学生归档索引与已归档学期集合（集合 ADD 操作天然幂等）
+    for student_id in list(grades_by_student) + [ARCHIVED_SEMESTERS_KEY]:
+        archive_index_table.update_item(
+            Key={'studentId': student_id},
+            UpdateExpression='ADD semesters :sem',
+            ExpressionAttributeValues={':sem': {semester}}
+        )
+
+    # 3. 从热表中删除已归档的记录
+    with grade_table.batch_writer() as batch:
+        for grade in hot_grades:
+            batch.delete_item(Key={'gradeId': grade['gradeId']})
+
+    # 4. 快照只保留热数据
+    apply_grade_changes(removed=hot_grades)
+    print(f"学期 {semester} 归档完成，迁移 {len(hot_grades)} 条成绩")
+    return len(hot_grades)
+
+
+def lambda_handler(event, context):
+    """归档任务入口：event = {"semesters": ["2022-2023学年第一学期", ...]}
+
+    剩余时间不足时返回未处理的学期，用同样的参数再次调用即可续跑。
+    """
+    semesters = event.get('semesters') or []
+    archived = {}
+    for position, semester in enumerate(semesters):
+        if context is not None and context.get_remaining_time_in_millis() < TIME_BUDGET_MARGIN_MS:
+            return {'archived': archived, 'remaining': semesters[position:]}
+        archived[semester] = archive_semester(semester)
+    return {'archived': archived, 'remaining': []}
@@ -0,0 +1,93 @@
+from bisect import bisect_right
+from decimal import Decimal, InvalidOperation
+
+# 百分制成绩到绩点的换算（4.0 制）：(分数下限, 绩点)，按分数下限升序
+GPA_SCALE = [
+    (Decimal(0), Decimal('0')),
+    (Decimal(60), Decimal('1.0')),
+    (Decimal(64), Decimal('1.5')),
+    (Decimal(68), Decimal('2.0')),
+    (Decimal(72), Decimal('2.3')),
+    (Decimal(75), Decimal('2.7')),
+    (Decimal(78), Decimal('3.0')),
+    (Decimal(82), Decimal('3.3')),
+    (Decimal(85), Decimal('3.7')),
+    (Decimal(90), Decimal('4.0')),
+]
+_SCALE_BOUNDS = [bound for bound, _ in GPA_SCALE]
+
+# 成绩未填写学分时按 1 学分计（即退化为算术平均）
+DEFAULT_CREDIT = Decimal(1)
+TWO_PLACES = Decimal('0.01')
+
+
+def grade_point(score):
+    """百分制分数对应的绩点"""
+    return GPA_SCALE[max(0, bisect_right(_SCALE_BOUNDS, score) - 1)][1]
+
+
+def parse_credit(value):
+    """解析学分：未填写（None、空字符串、表格中的空单元格）返回 None；
+    必须是大于 0 的有限数字（不接受布尔值），否则抛出 ValueError"""
+    if value is None or value == '' or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, bool):
+        raise ValueError('学分必须是大于0的数字')
+    credit = _to_decimal(value)
+    if credit is None or not credit.is_finite() or credit <= 0:
+        raise ValueError('学分必须是大于0的数字')
+    return credit
+
+
+def _to_decimal(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def summarize_by_semester(grades):
+    """一次遍历把成绩累加为按学期的汇总：{学期: {courseCount, credits, weightedScore, weightedPoints}}
+
+    只保存可累加的和，平均分与 GPA 在读取时由 summary_view 计算，多个学期也可直接相加。
+    分数缺失或无法解析的成绩不计入。
+    """
+    summaries = {}
+    for grade in grades:
+        score = _to_decimal(grade.get('score'))
+        if score is None:
+            continue
+        credit = _to_decimal(grade.get('credit')) or DEFAULT_CREDIT
+        summary = summaries.setdefault(grade.get('semester', ''), {
+            'courseCount': 0,
+            'credits': Decimal(0),
+            'weightedScore': Decimal(0),
+            'weightedPoints': Decimal(0),
+        })
+        summary['courseCount'] += 1
+        summary['credits'] += credit
+        summary['weightedScore'] += score * credit
+        summary['weightedPoints'] += grade_point(score) * credit
+    return summaries
+
+
+def summary_view(summary):
+    """把累加值换算成展示用的 学分加权平均分 与 GPA（保留两位小数）"""
+    credits = summary['credits']
+    if not credits:
+        return {'courseCount': 0, 'totalCredits': Decimal(0), 'weightedAverage': None, 'gpa': None}
+    return {
+        'courseCount': summary['courseCount'],
+        'totalCredits': credits,
+        'weightedAverage': (summary['weightedScore'] / credits).quantize(TWO_PLACES),
+        'gpa': (summary['weightedPoints'] / credits).quantize(TWO_PLACES),
+    }
+
+
+def combine(summaries):
+    """合并多个学期的累加值，用于计算总平均分与总 GPA"""
+    total = {'courseCount': 0, 'credits': Decimal(0), 'weightedScore': Decimal(0), 'weightedPoints': Decimal(0)}
+    for summary in summaries:
+        for field in total:
+            total[field] += summary[field]
+    return total
@@ -0,0 +1,49 @@
+import base64
+import gzip
+import json
+from decimal import Decimal
+
+# 优先使用 orjson（C 实现，序列化快数倍），未安装时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 响应体超过该字节数且客户端支持 gzip 时才压缩，小响应压缩得不偿失
+GZIP_MIN_BYTES = 8 * 1024
+
+
+def decimal_to_number(value):
+    """DynamoDB 的 Decimal 转为 JSON 数字：整数值转 int，带小数（如 89.5 分）转 float，不再截断"""
+    if value == value.to_integral_value():
+        return int(value)
+    return float(value)
+
+
+def encode_default(value):
+    """序列化遇到非原生类型时的回调：在编码器的同一次遍历中处理 Decimal 和 DynamoDB 的 set"""
+    if type(value) is Decimal:
+        return decimal_to_number(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(data):
+    """序列化为 JSON 字符串（自动处理 Decimal）"""
+    if orjson is not None:
+        return orjson.dumps(data, default=encode_default).decode('utf-8')
+    return json.dumps(data, default=encode_default)
+
+
+def accepts_gzip(event):
+    """判断请求方是否声明支持 gzip（API Gateway 的请求头大小写不固定）"""
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == 'accept-encoding':
+            return 'gzip' in (value or '').lower()
+    return False
+
+
+def gzip_body(text):
+    """gzip 压缩并 base64 编码，供 isBase64Encoded 响应使用（API Gateway 需开启二进制媒体类型）"""
+    return base64.b64encode(gzip.compress(text.encode('utf-8'), compresslevel=5)).decode('ascii')
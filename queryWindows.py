@@ -0,0 +1,117 @@
+import os
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+from apiCommon import query_time_table, scan_all
+
+# QueryTimeConfig 中的配置键：全局 / 按学期 / 按课程，优先级 课程 > 学期 > 全局
+GLOBAL_KEY = 'globalQueryTime'
+SEMESTER_PREFIX = 'semester:'
+COURSE_PREFIX = 'course:'
+
+# 其他容器修改查询时间后，本容器最多在该秒数后重新加载
+WINDOW_CACHE_TTL = int(os.environ.get('QUERY_WINDOW_TTL', '60'))
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+
+def safe_parse_iso_time(time_str):
+    try:
+        # 尝试解析带时区的格式（如 2025-10-31T10:50:00+08:00）
+        parsed = datetime.fromisoformat(time_str)
+    except ValueError:
+        # 若失败，尝试解析不带时区的格式（如 2025-10-31T10:50:00）
+        parsed = datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%S")
+    if parsed.tzinfo is not None:
+        # 统一转换为不带时区的北京时间，便于与当前北京时间比较
+        parsed = parsed.astimezone(BEIJING_TZ).replace(tzinfo=None)
+    return parsed
+
+
+def beijing_now():
+    return datetime.utcnow() + timedelta(hours=8)
+
+
+class QueryWindowIndex:
+    """查询时间段的区间索引
+
+    把所有时间段的起止时间排序成时间轴上的分段，并记录每一段内处于开放状态的配置键。
+    判断某一时刻哪些时间段开放只需一次二分查找（O(log n)），之后每条成绩只做集合查找。
+    时间段按左闭右开 [开始, 结束) 处理。
+
+    时间无法解析或开始不早于结束的配置仍然保留在 windows 中（课程 / 学期配置仍然生效，
+    不会退回到全局时间段提前开放），但永远不开放。
+    """
+
+    def __init__(self, configs):
+        self.windows = {}  # configKey -> (queryStartTime, queryEndTime) 原始字符串
+        events = []
+        for config in configs:
+            key = config.get('configKey')
+            start_str = config.get('queryStartTime', '')
+            end_str = config.get('queryEndTime', '')
+            if not key or not start_str or not end_str:
+                continue
+            self.windows[key] = (start_str, end_str)
+            try:
+                start = safe_parse_iso_time(start_str)
+                end = safe_parse_iso_time(end_str)
+            except ValueError:
+                print(f"查询时间配置无法解析，按未开放处理：{key}（{start_str} 至 {end_str}）")
+                continue
+            if start >= end:
+                print(f"查询时间配置开始时间不早于结束时间，按未开放处理：{key}（{start_str} 至 {end_str}）")
+                continue
+            events.append((start, key, True))
+            events.append((end, key, False))
+
+        # 扫描线：在每个边界时刻更新开放集合
+        events.sort(key=lambda event: event[0])
+        self.boundaries = []
+        self.open_sets = []
+        active = set()
+        for moment, key, is_start in events:
+            if is_start:
+                active.add(key)
+            else:
+                active.discard(key)
+            if self.boundaries and self.boundaries[-1] == moment:
+                self.open_sets[-1] = frozenset(active)
+            else:
+                self.boundaries.append(moment)
+                self.open_sets.append(frozenset(active))
+
+    def open_keys(self, now):
+        """返回 now 时刻处于开放状态的配置键集合"""
+        position = bisect_right(self.boundaries, now) - 1
+        if position < 0:
+            return frozenset()
+        return self.open_sets[position]
+
+    def applicable_key(self, course, semester):
+        """某条成绩适用的配置键（课程 > 学期 > 全局），未配置任何时间段时返回 None"""
+        for key in (COURSE_PREFIX + course, SEMESTER_PREFIX + semester, GLOBAL_KEY):
+            if key in self.windows:
+                return key
+        return None
+
+
+_index = None
+_loaded_at = 0.0
+
+
+def get_window_index():
+    """获取本容器缓存的区间索引，首次调用或超过 TTL 时从 QueryTimeConfig 加载"""
+    global _index, _loaded_at
+    if _index is None or time.monotonic() - _loaded_at > WINDOW_CACHE_TTL:
+        refresh_window_index()
+    return _index
+
+
+def refresh_window_index():
+    """重新加载所有查询时间段（设置查询时间后调用）"""
+    global _index, _loaded_at
+    _index = QueryWindowIndex(scan_all(query_time_table))
+    _loaded_at = time.monotonic()
+    return _index
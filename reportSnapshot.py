@@ -0,0 +1,239 @@
+import boto3
+import json
+import os
+import threading
+from datetime import datetime
+
+from apiCommon import grade_table, snapshot_table, scan_all, projection, clip_log
+from gradeSummary import summarize_by_semester
+
+# 快照中每门成绩只保留前端展示需要的字段
+REPORT_FIELDS = ('gradeId', 'course', 'score', 'semester', 'updateTime')
+# 只在成绩中存在时才写入快照的字段
+OPTIONAL_REPORT_FIELDS = ('credit',)
+# 构建快照时从成绩表读取的属性（createTime 等其余属性不读取）
+SOURCE_FIELDS = ('studentId',) + REPORT_FIELDS + OPTIONAL_REPORT_FIELDS
+
+# 一次变更涉及的学生超过该数量时（如批量导入），改为异步全量重建，避免逐个学生读写快照
+FULL_REBUILD_THRESHOLD = 50
+# 并发修改同一学生快照发生冲突时的重试次数，仍失败则作废快照，由下次读取重新构建
+PATCH_RETRIES = 3
+# 快照版本号：每次成绩变更都会递增（快照不存在时也会写入只含版本号的占位记录），
+# 重建快照前先读取版本，写入时要求版本未变，避免扫描期间发生的变更被旧结果覆盖
+SNAPSHOT_VERSION = 'snapshotVersion'
+
+# 异步重建快照时调用的 Lambda（默认为当前函数，由 apiRouter 识别下面的事件来源）
+REBUILD_FUNCTION = os.environ.get('SNAPSHOT_REBUILD_FUNCTION') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
+REBUILD_EVENT_SOURCE = 'grade.snapshot-rebuild'
+
+_lambda_client = None
+
+# 同一容器内对同一学生的并发未命中合并为一次构建：studentId -> 正在进行的构建
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _InflightBuild:
+    def __init__(self):
+        self.done = threading.Event()
+        self.report = None
+        self.error = None
+
+
+def to_report_row(grade):
+    """成绩表中的一条记录 -> 快照中的一行"""
+    row = {field: grade.get(field, '') for field in REPORT_FIELDS}
+    row.update({field: grade[field] for field in OPTIONAL_REPORT_FIELDS if field in grade})
+    return row
+
+
+def build_report(student_id, grades):
+    """把某个学生的成绩整理成紧凑的成绩单文档（即快照表中的一条记录）
+
+    快照不含查询时间段，是否可见由 queryWindows 的区间索引在读取时判断。
+    按学期的成绩汇总（加权平均分 / GPA 的累加值）也在这里一并算好，随快照一起更新。
+    """
+    rows = [to_report_row(grade) for grade in grades]
+    return {
+        'studentId': student_id,
+        'grades': rows,
+        'semesterSummaries': summarize_by_semester(rows),
+        'builtAt': datetime.utcnow().isoformat()
+    }
+
+
+def read_snapshot_version(student_id):
+    """强一致读取学生快照的版本（只读 studentId 与版本号），没有记录时返回 None"""
+    return snapshot_table.get_item(
+        Key={'studentId': student_id},
+        ConsistentRead=True,
+        **projection(('studentId', SNAPSHOT_VERSION))
+    ).get('Item')
+
+
+def put_snapshot_if_unchanged(report, current):
+    """以读取到的记录 current 为基准条件写入快照，版本号加一；期间快照被改过则不写入并返回 False"""
+    if current is None:
+        condition = {'ConditionExpression': 'attribute_not_exists(studentId)'}
+    elif SNAPSHOT_VERSION not in current:
+        condition = {'ConditionExpression': f'attribute_not_exists({SNAPSHOT_VERSION})'}
+    else:
+        condition = {
+            'ConditionExpression': f'{SNAPSHOT_VERSION} = :version',
+            'ExpressionAttributeValues': {':version': current[SNAPSHOT_VERSION]}
+        }
+    report[SNAPSHOT_VERSION] = (current or {}).get(SNAPSHOT_VERSION, 0) + 1
+    try:
+        snapshot_table.put_item(Item=report, **condition)
+        return True
+    except snapshot_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+
+
+def invalidate_snapshot(student_id):
+    """作废学生快照：去掉成绩只保留递增后的版本号，下次读取时重新构建"""
+    snapshot_table.update_item(
+        Key={'studentId': student_id},
+        UpdateExpression=f'ADD {SNAPSHOT_VERSION} :one REMOVE grades, semesterSummaries',
+        ExpressionAttributeValues={':one': 1}
+    )
+
+
+def rebuild_student_snapshot(student_id):
+    """扫描成绩表重新计算并写入单个学生的快照（快照不存在时按需构建）
+
+    使用强一致读取，确保包含刚刚写入的成绩；扫描期间成绩有变更时本次结果只返回、不回写。
+    """
+    current = read_snapshot_version(student_id)
+    grades = scan_all(
+        grade_table,
+        FilterExpression='studentId = :sid',
+        ExpressionAttributeValues={':sid': student_id},
+        ConsistentRead=True,
+        **projection(SOURCE_FIELDS)
+    )
+    report = build_report(student_id, grades)
+    if not put_snapshot_if_unchanged(report, current):
+        print(f"学生 {student_id} 的成绩在构建快照期间有变更，本次不回写快照")
+    return report
+
+
+def rebuild_all_snapshots():
+    """全量重建：一次分页扫描成绩表，按学生分组后批量写入快照表
+
+    在设置查询时间段时或由定时任务触发，使查询窗口开放前所有学生的成绩单都已就绪。
+    扫描成绩表之前先读取所有快照的版本，逐个条件写入；扫描期间有变更的学生跳过（已由变更方更新或作废）。
+    """
+    versions = {
+        item['studentId']: item
+        for item in scan_all(snapshot_table, ConsistentRead=True, **projection(('studentId', SNAPSHOT_VERSION)))
+    }
+    grades_by_student = {}
+    for grade in scan_all(grade_table, ConsistentRead=True, **projection(SOURCE_FIELDS)):
+        grades_by_student.setdefault(grade['studentId'], []).append(grade)
+
+    skipped = 0
+    for student_id, grades in grades_by_student.items():
+        if not put_snapshot_if_unchanged(build_report(student_id, grades), versions.get(student_id)):
+            skipped += 1
+    print(f"成绩单快照重建完成，共 {len(grades_by_student)} 名学生，其中 {skipped} 名重建期间有变更已跳过")
+    return len(grades_by_student)
+
+
+def request_snapshot_rebuild():
+    """异步触发全量重建（InvocationType=Event），不占用当前 API 请求的执行时间
+
+    本地运行没有函数名时直接同步重建。
+    """
+    global _lambda_client
+    if not REBUILD_FUNCTION:
+        rebuild_all_snapshots()
+        return
+    if _lambda_client is None:
+        _lambda_client = boto3.client('lambda')
+    _lambda_client.invoke(
+        FunctionName=REBUILD_FUNCTION,
+        InvocationType='Event',
+        Payload=json.dumps({'source': REBUILD_EVENT_SOURCE}).encode('utf-8')
+    )
+
+
+def get_student_report(student_id, fields=None):
+    """读取学生成绩单：命中快照时只需一次 get_item，未命中时构建并回写快照
+
+    fields 指定时只读取快照中的这些属性（需包含 grades）；未命中时返回新构建的完整成绩单。
+    只有版本号、没有 grades 的占位记录视为未命中。
+    """
+    read_kwargs = projection(fields) if fields else {}
+    report = snapshot_table.get_item(Key={'studentId': student_id}, **read_kwargs).get('Item')
+    if report and 'grades' in report:
+        return report
+
+    with _inflight_lock:
+        build = _inflight.get(student_id)
+        is_owner = build is None
+        if is_owner:
+            build = _inflight[student_id] = _InflightBuild()
+
+    if not is_owner:
+        # 其他请求正在构建该学生的快照，等待其结果
+        build.done.wait()
+        if build.error:
+            raise build.error
+        return build.report
+
+    try:
+        build.report = rebuild_student_snapshot(student_id)
+        return build.report
+    except Exception as e:
+        build.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(student_id, None)
+        build.done.set()
+
+
+def patch_student_snapshot(student_id, upserts, removed_ids):
+    """把变更直接合入学生已有的快照（一次读、一次条件写），不再扫描成绩表
+
+    upserts 为新增或修改后的成绩，removed_ids 为被删除成绩的 gradeId。
+    快照不存在时只递增版本号，使正在构建的旧快照写入失败，下次读取时按需构建。
+    """
+    for _ in range(PATCH_RETRIES):
+        report = snapshot_table.get_item(Key={'studentId': student_id}, ConsistentRead=True).get('Item')
+        if not report or 'grades' not in report:
+            invalidate_snapshot(student_id)
+            return
+        changed = {grade['gradeId']: to_report_row(grade) for grade in upserts}
+        rows = []
+        for row in report.get('grades', []):
+            grade_id = row.get('gradeId')
+            if grade_id in removed_ids:
+                continue
+            rows.append(changed.pop(grade_id, row))
+        rows.extend(changed.values())
+        # 读取之后快照被其他请求改过则重试
+        if put_snapshot_if_unchanged(build_report(student_id, rows), report):
+            return
+    invalidate_snapshot(student_id)
+
+
+def apply_grade_changes(upserts=(), removed=()):
+    """成绩写入后更新相关学生的快照；失败只记录日志，不影响成绩写入本身
+
+    upserts 为新增或修改后的完整成绩记录，removed 为被删除的成绩（至少包含 studentId 与 gradeId）。
+    """
+    changes = {}
+    for grade in upserts:
+        changes.setdefault(grade['studentId'], ([], set()))[0].append(grade)
+    for grade in removed:
+        changes.setdefault(grade['studentId'], ([], set()))[1].add(grade['gradeId'])
+    try:
+        if len(changes) > FULL_REBUILD_THRESHOLD:
+            request_snapshot_rebuild()
+            return
+        for student_id, (student_upserts, removed_ids) in changes.items():
+            patch_student_snapshot(student_id, student_upserts, removed_ids)
+    except Exception as e:
+        print(clip_log(f"成绩单快照更新失败（学生：{list(changes)}）：{str(e)}"))
@@ -1,48 +1,35 @@
-import boto3
 import json
 from datetime import datetime
 
-# 初始化 DynamoDB 资源
-dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-grade_table = dynamodb.Table('Grade')
-query_time_table = dynamodb.Table('QueryTimeConfig')  # 新增查询时间表
+from apiCommon import query_time_table, build_response
+from reportSnapshot import request_snapshot_rebuild
+from queryWindows import refresh_window_index, safe_parse_iso_time, GLOBAL_KEY
 
 def lambda_handler(event, context):
-    http_method = event['httpMethod']
-    path = event['path']
-    
-    # 1. 设置查询时间段：POST /query-time
-    if http_method == 'POST' and path == '/query-time':
-        return handle_set_query_time(event)
-    
-    # 2. 查询当前查询时间段：GET /query-time
-    elif http_method == 'GET' and path == '/query-time':
-        return handle_get_query_time()
-    
-    # 其他接口（成绩查询、修改、删除）...
-    else:
-        return {
-            'statusCode': 404,
-            'headers': {'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'},
-            'body': json.dumps({'message': '接口不存在'})
-        }
+    # 兼容旧的独立部署：统一交给 apiRouter 分发
+    import apiRouter
+    return apiRouter.lambda_handler(event, context)
 
-# 设置查询时间段（教师操作）
-def handle_set_query_time(event):
+# 设置查询时间段（教师操作）：POST /query-time
+def handle_set_query_time(event, path_params):
     try:
         body = json.loads(event['body'])
-        config_key = body.get('configKey', 'globalQueryTime')  # 默认为全局配置
+        # 配置键：globalQueryTime（全局，默认）、semester:<学期>、course:<课程>
+        config_key = body.get('configKey') or GLOBAL_KEY
         start_time = body.get('queryStartTime')
         end_time = body.get('queryEndTime')
-        
-        # 验证时间格式（可选，示例用字符串直接存储）
+
+        # 验证时间格式：开始时间必须早于结束时间
         if not start_time or not end_time:
-            return {
-                'statusCode': 400,
-                'headers': {'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'},
-                'body': json.dumps({'message': '请填写开始时间和结束时间'})
-            }
-        
+            return build_response(400, {'message': '请填写开始时间和结束时间'})
+        try:
+            start = safe_parse_iso_time(start_time)
+            end = safe_parse_iso_time(end_time)
+        except (TypeError, ValueError):
+            return build_response(400, {'message': '时间格式不正确，应为 YYYY-MM-DDTHH:MM:SS'})
+        if start >= end:
+            return build_response(400, {'message': '开始时间必须早于结束时间'})
+
         # 写入查询时间表
         query_time_table.put_item(
             Item={
@@ -52,44 +39,39 @@ def handle_set_query_time(event):
                 'updateTime': datetime.utcnow().isoformat()
             }
         )
-        
-        return {
-            'statusCode': 200,
-            'headers': {'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'},
-            'body': json.dumps({
-                'message': '查询时间段设置成功',
-                'configKey': config_key,
-                'queryStartTime': start_time,
-                'queryEndTime': end_time
-            })
-        }
+
+        # 刷新本容器的查询时间段索引
+        refresh_window_index()
+
+        # 异步预生成全部学生的成绩单快照（全量扫描可能超过 API Gateway 的 29 秒限制）；
+        # 触发失败不影响设置结果，定时任务会重建，学生查询时也会按需构建
+        try:
+            request_snapshot_rebuild()
+        except Exception as e:
+            print(f"成绩单快照重建触发失败：{str(e)}")
+
+        return build_response(200, {
+            'message': '查询时间段设置成功',
+            'configKey': config_key,
+            'queryStartTime': start_time,
+            'queryEndTime': end_time
+        })
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'},
-            'body': json.dumps({'message': f'设置失败：{str(e)}'})
-        }
+        return build_response(500, {'message': f'设置失败：{str(e)}'})
 
-# 查询当前查询时间段
-def handle_get_query_time():
+# 查询当前查询时间段：GET /query-time?configKey=xxx（默认全局）
+def handle_get_query_time(event, path_params):
     try:
+        config_key = event.get('queryStringParameters', {}).get('configKey') or GLOBAL_KEY
         response = query_time_table.get_item(
-            Key={'configKey': 'globalQueryTime'}
+            Key={'configKey': config_key}
         )
         config = response.get('Item', {})
-        
-        return {
-            'statusCode': 200,
-            'headers': {'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'},
-            'body': json.dumps({
-                'queryStartTime': config.get('queryStartTime', '未设置'),
-                'queryEndTime': config.get('queryEndTime', '未设置'),
-                'updateTime': config.get('updateTime', '未设置')
-            })
-        }
+
+        return build_response(200, {
+            'queryStartTime': config.get('queryStartTime', '未设置'),
+            'queryEndTime': config.get('queryEndTime', '未设置'),
+            'updateTime': config.get('updateTime', '未设置')
+        })
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Access-Control-Allow-Origin': 'http://grade111.s3-website.us-east-2.amazonaws.com'},
-            'body': json.dumps({'message': f'查询失败：{str(e)}'})
-        }
\ No newline at end of file
+        return build_response(500, {'message': f'查询失败：{str(e)}'})
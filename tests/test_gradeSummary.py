@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gradeSummary import grade_point, parse_credit, summarize_by_semester, summary_view, combine
+
+
+class GradePointTest(unittest.TestCase):
+    def test_boundaries(self):
+        cases = [
+            (0, '0'), (59.5, '0'), (60, '1.0'), (63.5, '1.0'), (64, '1.5'), (68, '2.0'), (72, '2.3'),
+            (75, '2.7'), (78, '3.0'), (82, '3.3'), (84.5, '3.3'), (85, '3.7'), (89.5, '3.7'), (90, '4.0'), (100, '4.0'),
+        ]
+        for score, point in cases:
+            self.assertEqual(grade_point(Decimal(str(score))), Decimal(point), score)
+
+    def test_negative_score_maps_to_zero(self):
+        self.assertEqual(grade_point(Decimal(-1)), Decimal('0'))
+
+
+class ParseCreditTest(unittest.TestCase):
+    def test_missing_values_return_none(self):
+        for value in (None, '', float('nan')):
+            self.assertIsNone(parse_credit(value))
+
+    def test_valid_values(self):
+        self.assertEqual(parse_credit(3), Decimal(3))
+        self.assertEqual(parse_credit('2.5'), Decimal('2.5'))
+        self.assertEqual(parse_credit(1.5), Decimal('1.5'))
+        self.assertEqual(parse_credit(Decimal('4')), Decimal(4))
+
+    def test_invalid_values_raise(self):
+        for value in (True, False, 0, -1, '0', 'abc', 'inf', 'NaN', float('inf')):
+            with self.assertRaises(ValueError, msg=repr(value)):
+                parse_credit(value)
+
+
+class SummaryTest(unittest.TestCase):
+    def test_weighted_by_credit(self):
+        summaries = summarize_by_semester([
+            {'semester': 'A', 'score': Decimal(90), 'credit': Decimal(3)},
+            {'semester': 'A', 'score': Decimal(60), 'credit': Decimal(1)},
+            {'semester': 'B', 'score': Decimal(80)},
+            {'semester': 'B', 'score': 'missing'},
+        ])
+        view = summary_view(summaries['A'])
+        self.assertEqual(view['courseCount'], 2)
+        self.assertEqual(view['totalCredits'], Decimal(4))
+        self.assertEqual(view['weightedAverage'], Decimal('82.50'))
+        self.assertEqual(view['gpa'], Decimal('3.25'))
+        self.assertEqual(summary_view(summaries['B'])['courseCount'], 1)
+
+    def test_combine(self):
+        summaries = summarize_by_semester([
+            {'semester': 'A', 'score': Decimal(90), 'credit': Decimal(2)},
+            {'semester': 'B', 'score': Decimal(70), 'credit': Decimal(2)},
+        ])
+        total = combine(summaries.values())
+        self.assertEqual(total['courseCount'], 2)
+        self.assertEqual(total['credits'], Decimal(4))
+        self.assertEqual(summary_view(total)['weightedAverage'], Decimal('80.00'))
+        self.assertEqual(summary_view(total)['gpa'], Decimal('3.00'))
+
+    def test_combine_nothing(self):
+        self.assertEqual(summary_view(combine([])),
+                         {'courseCount': 0, 'totalCredits': Decimal(0), 'weightedAverage': None, 'gpa': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
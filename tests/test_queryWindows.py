@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from queryWindows import QueryWindowIndex, GLOBAL_KEY, SEMESTER_PREFIX, COURSE_PREFIX
+import setQueryTime
+
+
+def window(key, start, end):
+    return {'configKey': key, 'queryStartTime': start, 'queryEndTime': end}
+
+
+class QueryWindowIndexTest(unittest.TestCase):
+    def test_half_open_interval(self):
+        index = QueryWindowIndex([window(GLOBAL_KEY, '2025-01-10T09:00:00', '2025-01-20T09:00:00')])
+        self.assertEqual(index.open_keys(datetime(2025, 1, 10, 8, 59)), frozenset())
+        self.assertEqual(index.open_keys(datetime(2025, 1, 10, 9, 0)), {GLOBAL_KEY})
+        self.assertEqual(index.open_keys(datetime(2025, 1, 20, 8, 59)), {GLOBAL_KEY})
+        self.assertEqual(index.open_keys(datetime(2025, 1, 20, 9, 0)), frozenset())
+
+    def test_overlapping_windows(self):
+        course_key = COURSE_PREFIX + '高等数学'
+        index = QueryWindowIndex([
+            window(GLOBAL_KEY, '2025-01-10T00:00:00', '2025-01-20T00:00:00'),
+            window(course_key, '2025-01-15T00:00:00', '2025-01-25T00:00:00'),
+        ])
+        self.assertEqual(index.open_keys(datetime(2025, 1, 12)), {GLOBAL_KEY})
+        self.assertEqual(index.open_keys(datetime(2025, 1, 16)), {GLOBAL_KEY, course_key})
+        self.assertEqual(index.open_keys(datetime(2025, 1, 22)), {course_key})
+
+    def test_shared_boundary(self):
+        semester_key = SEMESTER_PREFIX + '2024-2025学年第一学期'
+        index = QueryWindowIndex([
+            window(GLOBAL_KEY, '2025-01-10T00:00:00', '2025-01-15T00:00:00'),
+            window(semester_key, '2025-01-15T00:00:00', '2025-01-20T00:00:00'),
+        ])
+        self.assertEqual(index.open_keys(datetime(2025, 1, 15)), {semester_key})
+
+    def test_timezone_aware_times_use_beijing_time(self):
+        index = QueryWindowIndex([window(GLOBAL_KEY, '2025-01-10T01:00:00+00:00', '2025-01-10T02:00:00+00:00')])
+        self.assertEqual(index.open_keys(datetime(2025, 1, 10, 9, 30)), {GLOBAL_KEY})
+        self.assertEqual(index.open_keys(datetime(2025, 1, 10, 1, 30)), frozenset())
+
+    def test_inverted_window_never_opens(self):
+        index = QueryWindowIndex([window(GLOBAL_KEY, '2026-10-20T00:00:00', '2026-10-01T00:00:00')])
+        self.assertEqual(index.open_keys(datetime(2026, 10, 10)), frozenset())
+        self.assertEqual(index.open_keys(datetime(2030, 1, 1)), frozenset())
+
+    def test_empty_window_never_opens(self):
+        index = QueryWindowIndex([window(GLOBAL_KEY, '2026-10-01T00:00:00', '2026-10-01T00:00:00')])
+        self.assertEqual(index.open_keys(datetime(2026, 10, 1)), frozenset())
+
+    def test_invalid_course_window_does_not_fall_back_to_global(self):
+        course_key = COURSE_PREFIX + '高等数学'
+        index = QueryWindowIndex([
+            window(GLOBAL_KEY, '2025-01-10T00:00:00', '2025-01-20T00:00:00'),
+            window(course_key, 'not-a-time', '2025-01-25T00:00:00'),
+        ])
+        self.assertEqual(index.applicable_key('高等数学', '2024-2025学年第一学期'), course_key)
+        self.assertNotIn(course_key, index.open_keys(datetime(2025, 1, 15)))
+
+    def test_applicable_key_priority(self):
+        semester = '2024-2025学年第一学期'
+        index = QueryWindowIndex([
+            window(GLOBAL_KEY, '2025-01-10T00:00:00', '2025-01-20T00:00:00'),
+            window(SEMESTER_PREFIX + semester, '2025-01-10T00:00:00', '2025-01-20T00:00:00'),
+            window(COURSE_PREFIX + '高等数学', '2025-01-10T00:00:00', '2025-01-20T00:00:00'),
+        ])
+        self.assertEqual(index.applicable_key('高等数学', semester), COURSE_PREFIX + '高等数学')
+        self.assertEqual(index.applicable_key('大学英语', semester), SEMESTER_PREFIX + semester)
+        self.assertEqual(index.applicable_key('大学英语', '2023-2024学年第二学期'), GLOBAL_KEY)
+        self.assertIsNone(QueryWindowIndex([]).applicable_key('大学英语', semester))
+
+    def test_incomplete_config_is_ignored(self):
+        index = QueryWindowIndex([{'configKey': GLOBAL_KEY, 'queryStartTime': '2025-01-10T00:00:00'}])
+        self.assertEqual(index.windows, {})
+
+
+class SetQueryTimeValidationTest(unittest.TestCase):
+    def post(self, start, end):
+        event = {'body': json.dumps({'queryStartTime': start, 'queryEndTime': end})}
+        with mock.patch.object(setQueryTime, 'query_time_table') as table:
+            response = setQueryTime.handle_set_query_time(event, {})
+        return response['statusCode'], table
+
+    def test_rejects_inverted_window(self):
+        status, table = self.post('2026-10-20T00:00', '2026-10-01T00:00')
+        self.assertEqual(status, 400)
+        table.put_item.assert_not_called()
+
+    def test_rejects_empty_window(self):
+        status, table = self.post('2026-10-01T00:00', '2026-10-01T00:00')
+        self.assertEqual(status, 400)
+        table.put_item.assert_not_called()
+
+    def test_rejects_unparseable_time(self):
+        status, table = self.post('tomorrow', '2026-10-01T00:00')
+        self.assertEqual(status, 400)
+        table.put_item.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+import localDynamo
+import reportSnapshot
+from reportSnapshot import SNAPSHOT_VERSION
+
+
+def grade(grade_id, student_id='2024010101', score=90, semester='2024-2025学年第一学期'):
+    return {'gradeId': grade_id, 'studentId': student_id, 'course': '高等数学', 'score': Decimal(score),
+            'semester': semester, 'updateTime': '2025-01-10T09:00:00'}
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        localDynamo.latency_scale = 0
+        self.grades = localDynamo.LocalTable('Grade')
+        self.snapshots = localDynamo.LocalTable('StudentReportSnapshot')
+        for patcher in (mock.patch.object(reportSnapshot, 'grade_table', self.grades),
+                        mock.patch.object(reportSnapshot, 'snapshot_table', self.snapshots)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def add_grade(self, item):
+        self.grades.put_item(Item=item)
+        reportSnapshot.apply_grade_changes(upserts=[item])
+
+    def snapshot(self, student_id='2024010101'):
+        return self.snapshots.items.get(student_id)
+
+    def grade_ids(self, student_id='2024010101'):
+        return sorted(row['gradeId'] for row in self.snapshot(student_id)['grades'])
+
+    def during_scan(self, table, action):
+        """在扫描 table 时插入一次并发写入（模拟扫描与成绩变更交错）"""
+        original_scan = table.scan
+
+        def scan(**kwargs):
+            response = original_scan(**kwargs)
+            table.scan = original_scan
+            action()
+            return response
+        table.scan = scan
+
+
+class PatchStudentSnapshotTest(SnapshotTestCase):
+    def test_merges_upserts_and_removals(self):
+        for item in (grade('g1'), grade('g2')):
+            self.grades.put_item(Item=item)
+        reportSnapshot.get_student_report('2024010101')
+        version = self.snapshot()[SNAPSHOT_VERSION]
+
+        reportSnapshot.patch_student_snapshot('2024010101', [grade('g2', score=60), grade('g3')], {'g1'})
+        snapshot = self.snapshot()
+        self.assertEqual(self.grade_ids(), ['g2', 'g3'])
+        self.assertEqual({row['gradeId']: row['score'] for row in snapshot['grades']}['g2'], Decimal(60))
+        self.assertEqual(snapshot['semesterSummaries']['2024-2025学年第一学期']['courseCount'], 2)
+        self.assertEqual(snapshot[SNAPSHOT_VERSION], version + 1)
+
+    def test_missing_snapshot_only_bumps_version(self):
+        reportSnapshot.patch_student_snapshot('2024010101', [grade('g1')], set())
+        self.assertEqual(self.snapshot(), {'studentId': '2024010101', SNAPSHOT_VERSION: 1})
+
+        self.grades.put_item(Item=grade('g1'))
+        report = reportSnapshot.get_student_report('2024010101', fields=('grades',))
+        self.assertEqual([row['gradeId'] for row in report['grades']], ['g1'])
+        self.assertEqual(self.snapshot()[SNAPSHOT_VERSION], 2)
+
+    def test_repeated_conflicts_invalidate_snapshot(self):
+        self.add_grade(grade('g1'))
+        reportSnapshot.get_student_report('2024010101')
+        version = self.snapshot()[SNAPSHOT_VERSION]
+        with mock.patch.object(reportSnapshot, 'put_snapshot_if_unchanged', return_value=False) as put:
+            reportSnapshot.patch_student_snapshot('2024010101', [grade('g2')], set())
+        self.assertEqual(put.call_count, reportSnapshot.PATCH_RETRIES)
+        self.assertNotIn('grades', self.snapshot())
+        self.assertEqual(self.snapshot()[SNAPSHOT_VERSION], version + 1)
+
+
+class RebuildRaceTest(SnapshotTestCase):
+    def test_lazy_build_does_not_overwrite_concurrent_write(self):
+        self.grades.put_item(Item=grade('g1'))
+        self.during_scan(self.grades, lambda: self.add_grade(grade('g2')))
+
+        report = reportSnapshot.get_student_report('2024010101')
+        self.assertEqual([row['gradeId'] for row in report['grades']], ['g1'])
+        self.assertNotIn('grades', self.snapshot())
+
+        reportSnapshot.get_student_report('2024010101')
+        self.assertEqual(self.grade_ids(), ['g1', 'g2'])
+
+    def test_full_rebuild_skips_students_patched_during_scan(self):
+        self.grades.put_item(Item=grade('g1'))
+        self.grades.put_item(Item=grade('g9', student_id='2024010102'))
+        reportSnapshot.rebuild_all_snapshots()
+        self.during_scan(self.grades, lambda: self.add_grade(grade('g2')))
+
+        reportSnapshot.rebuild_all_snapshots()
+        self.assertEqual(self.grade_ids(), ['g1', 'g2'])
+        self.assertEqual(self.grade_ids('2024010102'), ['g9'])
+
+
+class ApplyGradeChangesTest(SnapshotTestCase):
+    def test_groups_changes_by_student(self):
+        with mock.patch.object(reportSnapshot, 'patch_student_snapshot') as patch:
+            reportSnapshot.apply_grade_changes(
+                upserts=[grade('g1'), grade('g2', student_id='2024010102')],
+                removed=[{'studentId': '2024010101', 'gradeId': 'g0'}]
+            )
+        self.assertEqual(sorted(patch.call_args_list), sorted([
+            mock.call('2024010101', [grade('g1')], {'g0'}),
+            mock.call('2024010102', [grade('g2', student_id='2024010102')], set()),
+        ]))
+
+    def test_large_change_requests_async_rebuild(self):
+        upserts = [grade(f'g{i}', student_id=str(i)) for i in range(reportSnapshot.FULL_REBUILD_THRESHOLD + 1)]
+        with mock.patch.object(reportSnapshot, 'request_snapshot_rebuild') as request, \
+                mock.patch.object(reportSnapshot, 'patch_student_snapshot') as patch:
+            reportSnapshot.apply_grade_changes(upserts=upserts)
+        request.assert_called_once_with()
+        patch.assert_not_called()
+
+    def test_errors_are_logged_not_raised(self):
+        with mock.patch.object(reportSnapshot, 'patch_student_snapshot', side_effect=RuntimeError('boom')), \
+                mock.patch('builtins.print') as log:
+            reportSnapshot.apply_grade_changes(upserts=[grade('g1')])
+        self.assertIn('boom', log.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
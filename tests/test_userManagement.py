@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
+
+import userManagement
+from userManagement import UserSearchIndex
+
+
+def user(user_id, username, email, user_type='student'):
+    return {'userId': user_id, 'username': username, 'email': email, 'userType': user_type, 'createTime': ''}
+
+
+USERS = [
+    user('2024010101', 'zhangsan', 'zhangsan@example.com'),
+    user('2024010102', 'zhaoliu', 'liu@example.com'),
+    user('t001', 'zhanglaoshi', 'zhang@example.com', 'teacher'),
+    user('a001', 'admin', 'admin@example.com', 'admin'),
+]
+
+
+def ids(users):
+    return [found['userId'] for found in users]
+
+
+class UserSearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = UserSearchIndex(USERS)
+
+    def search_all(self, prefix, user_type='all', limit=1):
+        results, after = [], None
+        while True:
+            page, after = self.index.search(prefix, user_type, limit, after)
+            results.extend(page)
+            if after is None:
+                return results
+
+    def test_user_matching_several_fields_is_returned_once(self):
+        # zhangsan 的用户名与邮箱都以 zhang 开头
+        self.assertEqual(sorted(ids(self.index.search('zhang')[0])), ['2024010101', 't001'])
+
+    def test_paging_does_not_repeat_or_skip_users(self):
+        for prefix in ('', 'zh', '2024'):
+            expected = sorted(ids(self.index.search(prefix, limit=100)[0]))
+            paged = ids(self.search_all(prefix, limit=1))
+            self.assertEqual(len(paged), len(set(paged)))
+            self.assertEqual(sorted(paged), expected)
+        self.assertEqual(len(self.search_all('')), len(USERS))
+
+    def test_type_filter(self):
+        self.assertEqual(ids(self.search_all('zh', 'teacher')), ['t001'])
+        self.assertEqual(sorted(ids(self.search_all('zh', 'student'))), ['2024010101', '2024010102'])
+        self.assertEqual(self.search_all('zh', 'admin'), [])
+
+    def test_prefix_is_case_insensitive(self):
+        self.assertEqual(ids(self.index.search('ADMIN')[0]), ['a001'])
+
+    def test_upsert_replaces_old_keys(self):
+        self.index.upsert(user('2024010102', 'wangwu', 'wangwu@example.com'))
+        self.assertEqual(ids(self.index.search('wang')[0]), ['2024010102'])
+        self.assertNotIn('2024010102', ids(self.index.search('zh')[0]))
+        self.assertEqual(len(self.index.entries), len(set(self.index.entries)))
+
+    def test_remove(self):
+        self.index.remove('student', '2024010101')
+        self.assertEqual(ids(self.index.search('zhang')[0]), ['t001'])
+        self.assertFalse(any(entry[2] == '2024010101' for entry in self.index.entries))
+        self.index.remove('student', 'missing')
+
+
+class SearchUsersTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(userManagement, 'get_user_index', return_value=UserSearchIndex(USERS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cursor_round_trip(self):
+        found, cursor = userManagement.search_users('', limit=3)
+        self.assertIsNotNone(cursor)
+        rest, cursor = userManagement.search_users('', limit=3, cursor=cursor)
+        self.assertIsNone(cursor)
+        self.assertEqual(sorted(ids(found + rest)), sorted(ids(USERS)))
+
+    def test_invalid_cursor_raises_value_error(self):
+        for cursor in ('garbage!!', 'e30=', '你好'):
+            with self.assertRaises(ValueError):
+                userManagement.search_users('', cursor=cursor)
+
+    def request(self, **params):
+        event = {
+            'httpMethod': 'GET',
+            'resource': '/admin/users/search',
+            'queryStringParameters': params,
+            'headers': {'Authorization': 'Bearer token'}
+        }
+        with mock.patch.object(userManagement.jwt, 'decode', return_value={'cognito:groups': ['admin']}):
+            response = userManagement.lambda_handler(event, None)
+        return response['statusCode'], json.loads(response['body'])
+
+    def test_bad_paging_parameters_return_400(self):
+        self.assertEqual(self.request(q='', limit='ten')[0], 400)
+        self.assertEqual(self.request(q='', cursor='garbage!!')[0], 400)
+        status, body = self.request(q='zh', limit='1')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['users']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
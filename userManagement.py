@@ -1,7 +1,10 @@
 import json
+import base64
 import boto3
 import jwt
 import os
+import time
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
 from botocore.exceptions import ClientError
 
@@ -16,6 +19,17 @@ CLIENT_ID = os.environ.get('CLIENT_ID')
 STUDENT_TABLE = 'StudentUser'
 TEACHER_TABLE = 'TeacherUser'
 ADMIN_TABLE = 'AdminUser'
+USER_TABLES = {
+    'student': STUDENT_TABLE,
+    'teacher': TEACHER_TABLE,
+    'admin': ADMIN_TABLE
+}
+
+# 用户搜索索引的有效期（秒），其他容器增删改用户后本容器最多延迟该时间可见
+USER_INDEX_TTL = int(os.environ.get('USER_INDEX_TTL', '300'))
+# 搜索结果分页大小
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
 
 def lambda_handler(event, context):
     print("收到请求:", event)  # 调试用
@@ -60,6 +74,30 @@ def lambda_handler(event, context):
                 'body': json.dumps({'users': users})
             }
         
+        # 1.1 按用户名/邮箱/用户ID前缀搜索用户（GET /admin/users/search）
+        elif http_method == 'GET' and resource == '/admin/users/search':
+            keyword = query_params.get('q', '')
+            user_type = query_params.get('userType', 'all')
+            try:
+                limit = int(query_params.get('limit', SEARCH_PAGE_SIZE))
+            except ValueError:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'message': 'limit 必须是整数'})
+                }
+            limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+            try:
+                users, next_cursor = search_users(keyword, user_type, limit, query_params.get('cursor'))
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'message': str(e)})
+                }
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'users': users, 'nextCursor': next_cursor})
+            }
+        
         # 2. 创建用户（POST /admin/users）
         elif http_method == 'POST' and resource == '/admin/users':
             body = json.loads(event.get('body', '{}'))
@@ -125,56 +163,153 @@ def lambda_handler(event, context):
 # 核心功能函数
 # ------------------------------
 
+def scan_table(table):
+    """分页扫描整张用户表（单次 scan 最多返回 1MB）"""
+    response = table.scan()
+    items = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+        items.extend(response.get('Items', []))
+    return items
+
+
+def to_user_summary(item, user_type):
+    """用户列表中展示的字段（按用户类型附带扩展字段）"""
+    summary = {
+        'userId': item['userId'],
+        'username': item.get('username', ''),
+        'email': item.get('email', ''),
+        'userType': user_type,
+        'createTime': item.get('createTime', '')
+    }
+    if user_type == 'student':
+        summary['grade'] = item.get('grade', '')
+    elif user_type == 'teacher':
+        summary['subject'] = item.get('subject', '')
+    elif user_type == 'admin':
+        summary['permission'] = item.get('permission', 'full')
+    return summary
+
+
 def get_users(user_type):
     """查询用户列表（按类型筛选）"""
     users = []
     # 根据用户类型查询对应 DynamoDB 表
-    if user_type == 'student' or user_type == 'all':
-        table = dynamodb.Table(STUDENT_TABLE)
-        response = table.scan()
-        users.extend([{
-            'userId': item['userId'],
-            'username': item['username'],
-            'email': item['email'],
-            'userType': 'student',
-            'grade': item.get('grade', ''),
-            'createTime': item['createTime']
-        } for item in response.get('Items', [])])
-    
-    if user_type == 'teacher' or user_type == 'all':
-        table = dynamodb.Table(TEACHER_TABLE)
-        response = table.scan()
-        users.extend([{
-            'userId': item['userId'],
-            'username': item['username'],
-            'email': item['email'],
-            'userType': 'teacher',
-            'subject': item.get('subject', ''),
-            'createTime': item['createTime']
-        } for item in response.get('Items', [])])
-    
-    if user_type == 'admin' or user_type == 'all':
-        table = dynamodb.Table(ADMIN_TABLE)
-        response = table.scan()
-        users.extend([{
-            'userId': item['userId'],
-            'username': item['username'],
-            'email': item['email'],
-            'userType': 'admin',
-            'permission': item.get('permission', 'full'),
-            'createTime': item['createTime']
-        } for item in response.get('Items', [])])
-    
+    for table_type, table_name in USER_TABLES.items():
+        if user_type == table_type or user_type == 'all':
+            table = dynamodb.Table(table_name)
+            users.extend([to_user_summary(item, table_type) for item in scan_table(table)])
     return users
 
 
+class UserSearchIndex:
+    """用户前缀搜索索引
+
+    把每个用户的用户名、邮箱、用户ID统一转成小写作为搜索键，按字典序保存在有序列表中，
+    前缀查询即为一次二分定位的连续区间（效果等同前缀树，但内存更紧凑）。
+    """
+
+    def __init__(self, users):
+        self.users = {}  # (userType, userId) -> 用户摘要
+        self.entries = []  # 有序的 (搜索键, userType, userId)
+        for user in users:
+            self.users[(user['userType'], user['userId'])] = user
+            self.entries.extend(self._entries_of(user))
+        self.entries.sort()
+
+    @staticmethod
+    def _keys_of(user):
+        return {str(user.get(field, '')).strip().lower() for field in ('username', 'email', 'userId')} - {''}
+
+    def _entries_of(self, user):
+        return [(key, user['userType'], user['userId']) for key in self._keys_of(user)]
+
+    def upsert(self, user):
+        """新增或修改用户后更新索引"""
+        self.remove(user['userType'], user['userId'])
+        self.users[(user['userType'], user['userId'])] = user
+        for entry in self._entries_of(user):
+            insort(self.entries, entry)
+
+    def remove(self, user_type, user_id):
+        """删除用户后从索引中移除"""
+        user = self.users.pop((user_type, user_id), None)
+        if not user:
+            return
+        for entry in self._entries_of(user):
+            position = bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+
+    def search(self, prefix, user_type='all', limit=SEARCH_PAGE_SIZE, after=None):
+        """返回 (匹配的用户列表, 下一页起点)；同一用户多个字段同时匹配时只返回一次"""
+        prefix = prefix.strip().lower()
+        start = bisect_right(self.entries, after) if after else bisect_left(self.entries, (prefix,))
+        results = []
+        for position in range(start, len(self.entries)):
+            entry = self.entries[position]
+            key, entry_type, user_id = entry
+            if not key.startswith(prefix):
+                break
+            if user_type != 'all' and entry_type != user_type:
+                continue
+            user = self.users[(entry_type, user_id)]
+            # 只在该用户最小的匹配键处返回，保证去重且翻页稳定
+            if key != min(k for k in self._keys_of(user) if k.startswith(prefix)):
+                continue
+            results.append(user)
+            if len(results) == limit:
+                return results, entry
+        return results, None
+
+
+_user_index = None
+_user_index_loaded_at = 0.0
+
+
+def get_user_index():
+    """获取本容器缓存的用户搜索索引，首次使用或超过有效期时重新构建"""
+    global _user_index, _user_index_loaded_at
+    if _user_index is None or time.monotonic() - _user_index_loaded_at > USER_INDEX_TTL:
+        _user_index = UserSearchIndex(get_users('all'))
+        _user_index_loaded_at = time.monotonic()
+    return _user_index
+
+
+def refresh_user_index(user=None, removed=None):
+    """增删改用户后同步本容器的搜索索引（索引尚未构建时无需处理，首次搜索会全量加载）"""
+    if _user_index is None:
+        return
+    if user:
+        _user_index.upsert(user)
+    if removed:
+        _user_index.remove(*removed)
+
+
+def decode_search_cursor(cursor):
+    """解析上一页返回的 nextCursor（索引中的一条 (搜索键, userType, userId)），格式不对时抛出 ValueError"""
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeEncodeError):
+        raise ValueError('分页游标无效')
+    if not isinstance(after, list) or len(after) != 3 or not all(isinstance(part, str) for part in after):
+        raise ValueError('分页游标无效')
+    return tuple(after)
+
+
+def search_users(keyword, user_type='all', limit=SEARCH_PAGE_SIZE, cursor=None):
+    """前缀搜索用户，cursor 为上一页返回的 nextCursor（无效时抛出 ValueError）"""
+    after = decode_search_cursor(cursor) if cursor else None
+    users, last_entry = get_user_index().search(keyword, user_type, limit, after)
+    next_cursor = None
+    if last_entry:
+        next_cursor = base64.urlsafe_b64encode(json.dumps(list(last_entry)).encode('utf-8')).decode('ascii')
+    return users, next_cursor
+
+
 def get_user_detail(user_id, user_type):
     """查询单个用户详情"""
-    table_name = {
-        'student': STUDENT_TABLE,
-        'teacher': TEACHER_TABLE,
-        'admin': ADMIN_TABLE
-    }.get(user_type)
+    table_name = USER_TABLES.get(user_type)
     if not table_name:
         raise ValueError('无效的用户类型')
     
@@ -228,11 +363,7 @@ def create_user(user_data):
             raise ValueError(f'Cognito 创建失败: {e.response["Error"]["Message"]}')
     
     # 3. 存储到 DynamoDB
-    table_name = {
-        'student': STUDENT_TABLE,
-        'teacher': TEACHER_TABLE,
-        'admin': ADMIN_TABLE
-    }.get(user_type)
+    table_name = USER_TABLES.get(user_type)
     if not table_name:
         raise ValueError('无效的用户类型')
     
@@ -253,6 +384,7 @@ def create_user(user_data):
         item['permission'] = user_data.get('permission', 'full')
     
     table.put_item(Item=item)
+    refresh_user_index(user=to_user_summary(item, user_type))
     return f'{user_type} 用户创建成功'
 
 
@@ -267,6 +399,15 @@ def update_user(user_data):
     if not all([user_id, user_type, username, email]):
         raise ValueError('缺少必填字段')
     
+    table_name = USER_TABLES.get(user_type)
+    if not table_name:
+        raise ValueError('无效的用户类型')
+    
+    # 先确认用户存在，避免修改了 Cognito 之后才发现 DynamoDB 中没有该用户
+    table = dynamodb.Table(table_name)
+    if 'Item' not in table.get_item(Key={'userId': user_id}):
+        raise ValueError(f'用户 {user_id} 不存在')
+    
     # 1. 更新 Cognito 用户信息
     try:
         # 更新邮箱和用户名
@@ -290,15 +431,6 @@ def update_user(user_data):
         raise ValueError(f'Cognito 更新失败: {e.response["Error"]["Message"]}')
     
     # 2. 更新 DynamoDB
-    table_name = {
-        'student': STUDENT_TABLE,
-        'teacher': TEACHER_TABLE,
-        'admin': ADMIN_TABLE
-    }.get(user_type)
-    if not table_name:
-        raise ValueError('无效的用户类型')
-    
-    table = dynamodb.Table(table_name)
     update_expr = 'set username = :u, email = :e'
     expr_attr = {':u': username, ':e': email}
     
@@ -313,22 +445,24 @@ def update_user(user_data):
         update_expr += ', permission = :p'
         expr_attr[':p'] = user_data['permission']
     
-    table.update_item(
-        Key={'userId': user_id},
-        UpdateExpression=update_expr,
-        ExpressionAttributeValues=expr_attr
-    )
+    try:
+        response = table.update_item(
+            Key={'userId': user_id},
+            UpdateExpression=update_expr,
+            ExpressionAttributeValues=expr_attr,
+            ConditionExpression='attribute_exists(userId)',  # 并发删除后不再新建只有部分字段的记录
+            ReturnValues='ALL_NEW'
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        raise ValueError(f'用户 {user_id} 不存在')
+    refresh_user_index(user=to_user_summary(response['Attributes'], user_type))
     return f'{user_type} 用户更新成功'
 
 
 def delete_user(user_id, user_type):
     """删除用户（同步删除 Cognito 和 DynamoDB 数据）"""
     # 1. 查询用户获取 username（用于删除 Cognito 用户）
-    table_name = {
-        'student': STUDENT_TABLE,
-        'teacher': TEACHER_TABLE,
-        'admin': ADMIN_TABLE
-    }.get(user_type)
+    table_name = USER_TABLES.get(user_type)
     if not table_name:
         raise ValueError('无效的用户类型')
     
@@ -350,4 +484,5 @@ def delete_user(user_id, user_type):
     
     # 3. 从 DynamoDB 中删除用户
     table.delete_item(Key={'userId': user_id})
+    refresh_user_index(removed=(user_type, user_id))
     return f'{user_type} 用户删除成功'
\ No newline at end of file